@@ -3,7 +3,6 @@ from pathlib import Path
 
 from tap import Tap
 
-from src import archive, fill_actor, mapping, merge, monitor, rss
 from src.utils.cleanup import aclose_all
 
 COMMANDS = ('archive', 'fill_actor', 'mapping', 'merge', 'monitor', 'rss')
@@ -69,26 +68,40 @@ def main() -> None:
     parser = Args()
     args = parser.parse_args()
     command_args = args.command_args or []
+    # import the chosen command lazily so a single command does not pay for
+    # every module's import-time dependencies
     if args.command == 'archive':
         if command_args:
             parser.error('archive does not accept arguments')
+        from src import archive  # noqa: PLC0415
+
         _run_sync_with_cleanup(archive.main)
     elif args.command == 'mapping':
         if command_args:
             parser.error('mapping does not accept arguments')
+        from src import mapping  # noqa: PLC0415
+
         _run_sync_with_cleanup(mapping.main)
     elif args.command == 'monitor':
         if command_args:
             parser.error('monitor does not accept arguments')
+        from src import monitor  # noqa: PLC0415
+
         asyncio.run(_run_async_with_cleanup(monitor.main()))
     elif args.command == 'rss':
         rss_args = RssArgs().parse_args(command_args)
+        from src import rss  # noqa: PLC0415
+
         asyncio.run(_run_async_with_cleanup(rss.main(rank=rss_args.rank)))
     elif args.command == 'fill_actor':
         fill_args = FillActorArgs().parse_args(command_args)
+        from src import fill_actor  # noqa: PLC0415
+
         asyncio.run(_run_async_with_cleanup(fill_actor.main(fill_args.actor_ids)))
     elif args.command == 'merge':
         merge_args = MergeArgs().parse_args(command_args)
+        from src import merge  # noqa: PLC0415
+
         _run_sync_with_cleanup(merge.main, merge_args.search_dir, merge_args.dst_dir, merge_args.filter)
     else:
         parser.error(f'Unknown command: {args.command}')
@@ -13,34 +13,42 @@ file_path = Path('./playlist.json')
 save_path = Path('./not_found.json')
 log = logger.get('playlist_move')
 
+ADD_CONCURRENCY = 4
+
 
 async def main() -> None:
     collection_avid = json.loads(file_path.read_text(encoding='utf-8'))
     movies = await get_items('Movie')
-    avid_item = {}
+    avid_item: dict[str, str] = {}
+    dupes: list[str] = []
     for movie in movies:
         avid = get_avid(movie['Name'])
         if not avid:
-            log.warning('%s no avid', movie["Name"])
-        elif avid in avid_item:
-            log.warning('%s duplicate', avid)
-        else:
-            avid_item[avid] = movie['Id']
+            log.warning('%s no avid', movie['Name'])
+        # setdefault hashes the avid once for both the dup check and the insert
+        elif avid_item.setdefault(avid, movie['Id']) != movie['Id']:
+            dupes.append(avid)
+    if dupes:
+        log.warning('%d duplicate avids:\n%s', len(dupes), '\n'.join(dupes))
     not_found = {}
+    collection_items: dict[str, list[str]] = {}
     for collection, avids in collection_avid.items():
-        not_found[collection] = []
-        items = []
-        log.info(collection)
-        for avid in avids:
-            if avid not in avid_item:
-                not_found[collection].append(avid)
-                continue
-            items.append(avid_item[avid])
-        if not_found[collection]:
-            log.warning('%d not found:\n%s', len(not_found[collection]), '\n'.join(not_found[collection]))
-        async with aiofiles.open(save_path, 'w') as f:
-            await f.write(json.dumps(not_found, indent=2))
-        await collection_add(collection, items)
+        missing = [avid for avid in avids if avid not in avid_item]
+        not_found[collection] = missing
+        collection_items[collection] = [avid_item[avid] for avid in avids if avid in avid_item]
+        if missing:
+            log.warning('%s: %d not found:\n%s', collection, len(missing), '\n'.join(missing))
+    # one dump once the map is complete instead of rewriting the file per collection
+    async with aiofiles.open(save_path, 'w') as f:
+        await f.write(json.dumps(not_found, indent=2))
+    semaphore = asyncio.Semaphore(ADD_CONCURRENCY)
+
+    async def add_one(collection: str, items: list[str]) -> None:
+        async with semaphore:
+            log.info(collection)
+            await collection_add(collection, items)
+
+    await asyncio.gather(*(add_one(collection, items) for collection, items in collection_items.items()))
 
 
 if __name__ == '__main__':
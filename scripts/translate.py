@@ -1,9 +1,11 @@
 import asyncio
 import importlib
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-from defusedxml.ElementTree import parse as xmlparse
+from lxml import etree
 from tqdm import tqdm
 
 from src.core import config, logger
@@ -22,6 +24,10 @@ XML_ESCAPE = str.maketrans(
 
 log = logger.get('translate')
 
+PARSE_WORKERS = 16
+NFO_TAGS = ('title', 'originaltitle', 'plot', 'originalplot', 'titletranslated')
+CD_SUFFIX_RE = re.compile(r'-cd\d+')
+
 
 def replace_xml(xml: str, tag: str, content: str) -> str:
     return re.sub(
@@ -37,7 +43,10 @@ def replace_xml(xml: str, tag: str, content: str) -> str:
 def check_translated_by_title(title: str, original_title: str) -> bool:
     if original_title in title:
         return False
-    return re.sub(r'-cd\d+', '', title) != get_avid(title)
+    # most titles carry no -cdN suffix; the substring test skips the regex and
+    # get_avid is memoized, so the common path is two string scans
+    stripped = CD_SUFFIX_RE.sub('', title) if '-cd' in title else title
+    return stripped != get_avid(title)
 
 
 async def translate(xml_text: str) -> str:
@@ -45,93 +54,127 @@ async def translate(xml_text: str) -> str:
     return result.translate(XML_ESCAPE)
 
 
-async def process_title(title: str, original_title: str, xml: str) -> str:
-    translated_ori_title = await translate(original_title)
+async def process_title(title: str, original_title: str, xml: str, translated_ori_title: str | None = None) -> str:
+    if translated_ori_title is None:
+        translated_ori_title = await translate(original_title)
     translated_ori_title = translated_ori_title.replace('\n', ' ')
     if original_title in title:  # noqa: SIM108
         new_title = title.replace(original_title, translated_ori_title)
     else:
         new_title = title + ' ' + translated_ori_title
-    xml = replace_xml(xml, 'title', new_title)
-    xml = replace_xml(xml, 'sorttitle', new_title)
-    return insert_tag_below(xml, 'title', 'titletranslated', 'true')
+
+    # rewrite <title> and append the translated marker in one scan instead of
+    # a replace_xml pass followed by insert_tag_below
+    def repl(match: re.Match) -> str:
+        indent = match.group(1)
+        return f'{indent}<title>{new_title}</title>\n{indent}<titletranslated>true</titletranslated>'
+
+    xml = re.sub(r'^(\s*)<title>(.*?)</title>', repl, xml, flags=re.DOTALL | re.MULTILINE, count=1)
+    return replace_xml(xml, 'sorttitle', new_title)
 
 
-async def process_plot(plot: str, xml: str) -> str:
+async def process_plot(plot: str, xml: str, translated_plot: str | None = None) -> str:
     new_xml = clone_tag(xml, 'plot', 'originalplot')
     # skip this if failed to copy tag
     if new_xml is None:
         log.error('Plot translation skipped because failed to copy tag')
         return xml
-    translated_plot = await translate(plot)
+    if translated_plot is None:
+        translated_plot = await translate(plot)
     # cover with CDATA
     translated_plot = f'<![CDATA[{translated_plot.replace("\n", "<br>")}]]>'
     return replace_xml(new_xml, 'plot', translated_plot)
 
 
-def clone_tag(xml: str, tag: str, new_tag: str) -> str | None:
-    pattern = rf'^(\s*)<{tag}>(.*?)</{tag}>'
-
-    # Check if the tag exists first
-    if not re.search(pattern, xml, flags=re.DOTALL | re.MULTILINE):
-        log.error('Failed to copy tag %s to %s', tag, new_tag)
+def _find_tag_block(xml: str, tag: str) -> tuple[int, int, str] | None:
+    """Locate `<tag>...</tag>` at the start of a line; returns (start, end, indent)."""
+    open_tag = f'<{tag}>'
+    close_tag = f'</{tag}>'
+    start = xml.find(open_tag)
+    if start < 0:
         return None
+    line_start = xml.rfind('\n', 0, start) + 1
+    indent = xml[line_start:start]
+    if indent.strip():
+        return None
+    close = xml.find(close_tag, start)
+    if close < 0:
+        return None
+    return start, close + len(close_tag), indent
 
-    def repl(match: re.Match) -> str:
-        indent = match.group(1)
-        content = match.group(2)
-        return f'{indent}<{tag}>{content}</{tag}>\n{indent}<{new_tag}>{content}</{new_tag}>'
-
-    return re.sub(pattern, repl, xml, flags=re.DOTALL | re.MULTILINE, count=1)
-
-
-def insert_tag_below(xml: str, tag: str, new_tag: str, content: str) -> str:
-    pattern = rf'^(\s*)<{tag}>(.*?)</{tag}>'
-
-    def repl(match: re.Match) -> str:
-        indent = match.group(1)
-        ori_content = match.group(2)
-        return f'{indent}<{tag}>{ori_content}</{tag}>\n{indent}<{new_tag}>{content}</{new_tag}>'
 
-    return re.sub(pattern, repl, xml, flags=re.DOTALL | re.MULTILINE, count=1)
+def clone_tag(xml: str, tag: str, new_tag: str) -> str | None:
+    # plain find+splice: one linear scan instead of a DOTALL|MULTILINE re.search
+    # plus re.sub over the whole document
+    block = _find_tag_block(xml, tag)
+    if block is None:
+        log.error('Failed to copy tag %s to %s', tag, new_tag)
+        return None
+    start, end, indent = block
+    content = xml[start + len(tag) + 2 : end - len(tag) - 3]
+    return f'{xml[:end]}\n{indent}<{new_tag}>{content}</{new_tag}>{xml[end:]}'
+
+
+def _parse_one(nfo_path: Path) -> dict[str, str]:
+    # lxml's C parser with a tag filter: only the five tags we look at are
+    # materialized, and the scan stops once all of them were seen;
+    # resolve_entities=False keeps the parse XXE-safe without defusedxml
+    found: dict[str, str | None] = {}
+    for _, elem in etree.iterparse(str(nfo_path), tag=NFO_TAGS, resolve_entities=False, no_network=True):
+        if elem.tag not in found:
+            found[elem.tag] = elem.text
+        elem.clear()
+        if len(found) == len(NFO_TAGS):
+            break
+    if 'title' not in found:
+        log.error('Title not found in %s', nfo_path)
+    entry: dict[str, str] = {}
+    original_title = found.get('originaltitle')
+    # check if title need to be translated
+    if 'titletranslated' not in found and original_title is not None and not check_translated_by_title(found.get('title'), original_title):
+        entry['title'] = found['title']
+        entry['original_title'] = original_title
+    # check if plot need to be translated
+    plot = found.get('plot')
+    if plot and 'originalplot' not in found:
+        entry['plot'] = plot
+    return entry
 
 
 def get_process_list() -> dict[Path, dict[str, str]]:
-    process_list = {}
     nfo_dir = config.translate.nfo_dir
-    for nfo_path in nfo_dir.glob('**/*.nfo'):
-        tree = xmlparse(nfo_path)
-        root = tree.getroot()
-        title_elem = root.find('title')
-        original_title_elem = root.find('originaltitle')
-        plot_elem = root.find('plot')
-        original_plot_elem = root.find('originalplot')
-        title_translated_elem = root.find('titletranslated')
-        if title_elem is None:
-            log.error('Title not found in %s', nfo_path)
-        # check if title need to be translated
-        if title_translated_elem is None and original_title_elem is not None and not check_translated_by_title(title_elem.text, original_title_elem.text):  # noqa: E501
-            process_list[nfo_path] = {
-                'title': title_elem.text,
-                'original_title': original_title_elem.text,
-            }
-        # check if plot need to be translated
-        if (plot_elem is not None) and plot_elem.text and (original_plot_elem is None):
-            if nfo_path not in process_list:
-                process_list[nfo_path] = {}
-            process_list[nfo_path]['plot'] = plot_elem.text
-    return process_list
+    nfo_paths = list(nfo_dir.glob('**/*.nfo'))
+    if not nfo_paths:
+        return {}
+    # the scan is read+parse bound; overlapping the disk reads dominates startup
+    # on large libraries
+    with ThreadPoolExecutor(max_workers=min(PARSE_WORKERS, len(nfo_paths))) as executor:
+        entries = list(executor.map(_parse_one, nfo_paths))
+    return {nfo_path: entry for nfo_path, entry in zip(nfo_paths, entries, strict=True) if entry}
 
 
 async def process_one(nfo_path: Path, data: dict[str, str]) -> None:
     log.info('Processing %s', nfo_path)
-    xml = nfo_path.read_text()
+    # keep disk I/O off the event loop so the semaphore slots stay busy with
+    # translator calls instead of stalling on the filesystem
+    xml = await asyncio.to_thread(nfo_path.read_text)
+    # translate title and plot in one round-trip instead of back to back
+    coros = []
+    if 'title' in data:
+        coros.append(translate(data['original_title']))
+    if 'plot' in data:
+        coros.append(translate(data['plot']))
+    translations = iter(await asyncio.gather(*coros))
     if 'title' in data:
-        xml = await process_title(data['title'], data['original_title'], xml)
+        xml = await process_title(data['title'], data['original_title'], xml, next(translations))
     if 'plot' in data:
-        xml = await process_plot(data['plot'], xml)
-    nfo_path.with_suffix('.nfo.tmp').write_text(xml)
-    nfo_path.with_suffix('.nfo.tmp').rename(nfo_path)
+        xml = await process_plot(data['plot'], xml, next(translations))
+    # encode once and publish atomically; os.replace also clobbers a leftover
+    # target where Path.rename could fail on non-POSIX filesystems
+    data = xml.encode('utf-8')
+    tmp_path = nfo_path.with_suffix('.nfo.tmp')
+    await asyncio.to_thread(tmp_path.write_bytes, data)
+    await asyncio.to_thread(os.replace, tmp_path, nfo_path)
 
 
 async def batch_process(batch_size: int = 10) -> None:
@@ -4,9 +4,12 @@ import csv
 import random
 from pathlib import Path
 
-from defusedxml.ElementTree import parse as xmlparse
-from openai import AsyncOpenAI, OpenAIError
+import httpx
+from defusedxml.ElementTree import iterparse
+from openai import APIConnectionError, APITimeoutError, AsyncOpenAI, OpenAIError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from tqdm import tqdm
+from tqdm.asyncio import tqdm_asyncio
 
 from src.core import config, logger
 
@@ -42,6 +45,7 @@ goHjgabjga7kuK3lh7rjgZcKICAgIOi+k+WHuu+8mgogICAg5paw5Lq65Ye66YGT77yB5riF57qv
 """
 
 PROMPT = base64.b64decode(PROMPT_BASE64).decode('utf-8')
+SYSTEM_MSG = {'role': 'system', 'content': PROMPT}
 
 # Models to test
 MODELS = [
@@ -52,57 +56,83 @@ MODELS = [
 ]
 
 
+PARSE_CONCURRENCY = 64
+TRANSLATE_CONCURRENCY = 64
+
+
+def _parse_original_title(nfo_path: Path) -> tuple[str, str] | None:
+    # iterparse stops at the first originaltitle instead of building the
+    # whole tree; large NFOs carry actor/fanart lists we never read
+    try:
+        with nfo_path.open('rb') as f:
+            for _, elem in iterparse(f):
+                if elem.tag == 'originaltitle':
+                    if elem.text:
+                        return nfo_path.name, elem.text
+                    # Stick to files with originaltitle to be safe.
+                    return None
+                elem.clear()
+    except Exception:
+        log.exception('Error parsing %s', nfo_path)
+    return None
+
+
 async def get_japanese_titles(nfo_dir: Path, limit: int = 100) -> list[tuple[str, str]]:
     """
     Scan for NFO files and extract japanese original titles.
     Returns list of (filename, original_title).
     """
-    titles = []
     nfos = list(nfo_dir.rglob('*.nfo'))
     random.shuffle(nfos)  # Randomize to get a mix
 
     log.info('Found %d nfo files. Processing...', len(nfos))
 
-    count = 0
-    for nfo_path in tqdm(nfos):
-        if count >= limit:
-            break
-        try:
-            tree = xmlparse(nfo_path)
-            root = tree.getroot()
-
-            # Try to get originaltitle
-            orig_title_elem = root.find('originaltitle')
-            if orig_title_elem is not None and orig_title_elem.text:
-                titles.append((nfo_path.name, orig_title_elem.text))
-                count += 1
-                continue
-
-            # If no originaltitle, check if title contains japanese chars (simple heuristic? No, just skip)
-            # Or assume title might be japanese if originaltitle is missing?
-            # Let's stick to files with originaltitle to be safe.
-
-        except Exception:
-            log.exception('Error parsing %s', nfo_path)
-            continue
+    # a fixed pool of workers pulling from one shared iterator keeps only
+    # ~PARSE_CONCURRENCY tasks alive and stops scheduling once the limit is hit
+    nfo_iter = iter(nfos)
+    titles: list[tuple[str, str]] = []
+
+    with tqdm(total=min(limit, len(nfos))) as pbar:
+
+        async def worker() -> None:
+            for nfo_path in nfo_iter:
+                if len(titles) >= limit:
+                    return
+                result = await asyncio.to_thread(_parse_original_title, nfo_path)
+                if result is not None and len(titles) < limit:
+                    titles.append(result)
+                    pbar.update(1)
+
+        await asyncio.gather(*[worker() for _ in range(PARSE_CONCURRENCY)])
 
     return titles
 
 
+@retry(
+    stop=stop_after_attempt(6),
+    wait=wait_exponential_jitter(initial=1, max=30),
+    retry=retry_if_exception_type((RateLimitError, APITimeoutError, APIConnectionError)),
+    reraise=True,
+)
+async def _chat(client: AsyncOpenAI, model: str, text: str) -> str:
+    completion = await client.chat.completions.create(
+        model=model,
+        messages=[
+            SYSTEM_MSG,
+            {'role': 'user', 'content': text},
+        ],
+        temperature=0,
+    )
+    return completion.choices[0].message.content
+
+
 async def translate_text(client: AsyncOpenAI, model: str, text: str) -> str:
     try:
-        completion = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {'role': 'system', 'content': PROMPT},
-                {'role': 'user', 'content': text},
-            ],
-            temperature=0,
-        )
-        tqdm.write(f'{model}: {completion.choices[0].message.content}')
-        return completion.choices[0].message.content
+        content = await _chat(client, model, text)
+        tqdm.write(f'{model}: {content}')
     except (OpenAIError, TimeoutError) as e:
         return f'Error: {e!s}'
+    return content
 
 
 def initialize_output(output_file: Path, header: list[str]) -> None:
@@ -119,8 +149,13 @@ def append_result(output_file: Path, header: list[str], row: dict[str, str]) ->
 
 async def main() -> Path | None:
     cfg = config.translator
-    # Use config from codebase
-    client = AsyncOpenAI(api_key=cfg.openai_api_key, base_url=cfg.openai_base_url)
+    # Use config from codebase; the SDK's default client caps connections well
+    # below TRANSLATE_CONCURRENCY, so inject one sized to match the semaphore.
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=TRANSLATE_CONCURRENCY, max_keepalive_connections=TRANSLATE_CONCURRENCY),
+        timeout=600,
+    )
+    client = AsyncOpenAI(api_key=cfg.openai_api_key, base_url=cfg.openai_base_url, http_client=http_client)
 
     try:
         nfo_dir = config.translate.nfo_dir
@@ -137,18 +172,39 @@ async def main() -> Path | None:
 
         log.info('Translating...')
         await asyncio.to_thread(initialize_output, output_file, header)
-        for filename, jp_title in tqdm(titles):
-            row = {'Filename': filename, 'Original Title': jp_title}
-            tasks = [translate_text(client, model, jp_title) for model in MODELS]
-            translations = await asyncio.gather(*tasks)
-
-            row.update(dict(zip(MODELS, translations, strict=True)))
-            await asyncio.to_thread(append_result, output_file, header, row)
+        semaphore = asyncio.Semaphore(TRANSLATE_CONCURRENCY)
+
+        async def translate_one(index: int, model: str, text: str) -> tuple[int, str, str]:
+            async with semaphore:
+                return index, model, await translate_text(client, model, text)
+
+        # translate each distinct title once; series/multi-part NFOs often share one
+        filenames_by_title: dict[str, list[str]] = {}
+        for filename, jp_title in titles:
+            filenames_by_title.setdefault(jp_title, []).append(filename)
+        unique_titles = list(filenames_by_title)
+        if len(unique_titles) < len(titles):
+            log.info('Deduplicated %d titles to %d unique', len(titles), len(unique_titles))
+
+        tasks = [translate_one(i, model, jp_title) for i, jp_title in enumerate(unique_titles) for model in MODELS]
+        results: dict[int, dict[str, str]] = {i: {} for i in range(len(unique_titles))}
+        # Append each row as soon as its title has all model results, so an
+        # interrupted run keeps the finished part of the comparison on disk.
+        for task in tqdm_asyncio.as_completed(tasks, desc='Translating'):
+            index, model, translation = await task
+            results[index][model] = translation
+            if len(results[index]) == len(MODELS):
+                jp_title = unique_titles[index]
+                translations = results.pop(index)
+                for filename in filenames_by_title[jp_title]:
+                    row = {'Filename': filename, 'Original Title': jp_title, **translations}
+                    await asyncio.to_thread(append_result, output_file, header, row)
 
         log.info('Comparison saved to %s', output_file.absolute())
         return output_file
     finally:
         await client.close()
+        await http_client.aclose()
 
 
 if __name__ == '__main__':
@@ -4,9 +4,11 @@ script that process videos and move to target directory
 """
 
 import asyncio
+import os
 import re
 import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import httpx
@@ -20,9 +22,25 @@ log = logger.get('archive')
 cfg = config.archive
 
 MAX_RENAME_ATTEMPTS = 5
+MOVE_WORKERS = 16
 COPY_SUFFIX_RE = re.compile(r'\s*\(\d+\)$')
+LEADING_00_RE = re.compile(r'[A-Z0-9]+-00\d{3,4}')
+DIGITS_RE = re.compile(r'\d+')
+PART_INDEX_RE = re.compile(r'-[A-Z]')
 CLOUDDRIVE_RETRY_EXCEPTIONS = (RpcError, httpx.HTTPError, httpx.TimeoutException)
 
+_brand_index: dict[str, str] = {}
+_brand_index_source: dict[str, list[str]] | None = None
+
+
+def _get_brand_index() -> dict[str, str]:
+    """Invert cfg.brand_mapping into brand -> dst for O(1) lookups."""
+    global _brand_index, _brand_index_source
+    if cfg.brand_mapping is not _brand_index_source:
+        _brand_index = {brand: brand_dst for brand_dst, brands in cfg.brand_mapping.items() for brand in brands}
+        _brand_index_source = cfg.brand_mapping
+    return _brand_index
+
 
 @retry(
     stop=stop_after_attempt(3),
@@ -34,6 +52,19 @@ def refresh_task_dir() -> None:
     clouddrive.get_sub_files(config.clouddrive.task_dir_path, force_refresh=True)
 
 
+class _LazyJoin:
+    """Defer building joined log arguments until the record is actually formatted."""
+
+    __slots__ = ('items', 'sep')
+
+    def __init__(self, sep: str, items: object) -> None:
+        self.sep = sep
+        self.items = items
+
+    def __str__(self) -> str:
+        return self.sep.join(str(item) for item in self.items)
+
+
 def _safe_relative(path: Path, base: Path) -> Path:
     try:
         return path.relative_to(base)
@@ -42,15 +73,20 @@ def _safe_relative(path: Path, base: Path) -> Path:
 
 
 def remove_00(avid: str) -> str:
-    match = re.match(r'[A-Z0-9]+-00\d{3,4}', avid)
-    if match:
+    if LEADING_00_RE.match(avid):
         log.info('Removed 00 for %s', avid)
-        return re.sub('00', '', avid, count=1)
+        return avid.replace('00', '', 1)
     return avid
 
 
+def _list_entries(root: Path) -> list[Path]:
+    """Snapshot a directory in one scandir pass instead of per-use iterdir calls."""
+    with os.scandir(root) as it:
+        return [Path(entry.path) for entry in it]
+
+
 def check_exists(avid: str, root: Path) -> bool:
-    return any(f.name.startswith(avid) for f in root.iterdir() if is_video(f))
+    return any(f.name.startswith(avid) for f in _list_entries(root) if is_video(f))
 
 
 def multi_part_video_check(videos: list[Path]) -> bool:
@@ -59,11 +95,11 @@ def multi_part_video_check(videos: list[Path]) -> bool:
         raise ValueError(msg)
 
     # check videos only have different digits
-    non_digit_parts = {re.sub(r'\d+', '', video.name) for video in videos}
+    non_digit_parts = {DIGITS_RE.sub('', video.name) for video in videos}
     if len(non_digit_parts) == 1:
         return True
     # check videos like xxx-A.mp4 xxx-B.mp4
-    non_index_parts = {re.sub(r'-[A-Z]', '', video.name) for video in videos}
+    non_index_parts = {PART_INDEX_RE.sub('', video.name) for video in videos}
     return len(non_index_parts) == 1
 
 
@@ -101,7 +137,7 @@ def drop_duplicate_copies(folder: Path, videos: list[Path]) -> list[Path]:
             'duplicate videos found in %s, keeping %s and dropping %s',
             folder.name,
             base.name,
-            ', '.join(copy.name for copy in copies),
+            _LazyJoin(', ', [copy.name for copy in copies]),
         )
         for copy in copies:
             try:
@@ -138,40 +174,74 @@ def _check_rename_targets(planned_renames: list[tuple[Path, Path, str]]) -> None
         planned_targets.add(target)
 
 
-def rename(root: Path) -> None:
-    renamed_any = False
+def _execute_moves(moves: list[tuple[Path, Path]]) -> None:
+    """Run independent rename syscalls concurrently; each is a network RTT on cloud mounts.
+
+    Destinations are validated up front by the planning step, so this uses a
+    single rename syscall per move without re-probing existence.
+    """
+    if len(moves) == 1:
+        src, dst = moves[0]
+        src.replace(dst)
+        return
+    with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as pool:
+        list(pool.map(lambda move: move[0].replace(move[1]), moves))
+
+
+def rename(root: Path, entries: list[Path] | None = None) -> list[Path]:
     if not root.is_dir():
         msg = f'{root} is not a directory'
         raise ValueError(msg)
+    if entries is None:
+        entries = _list_entries(root)
     avids: dict[str, set[Path]] = {}
-    for video in root.iterdir():
+    for video in entries:
         if not is_video(video):
             continue
         avid = remove_00(get_avid(video.name))
         avids.setdefault(avid, set()).add(video)
+    all_renames: list[tuple[Path, Path, str]] = []
     for avid, videos_set in avids.items():
         videos = sorted(videos_set, key=lambda x: x.name)
         planned_renames = _build_rename_plan(root, avid, videos)
         _check_rename_targets(planned_renames)
-        for video, target, new_name in planned_renames:
-            log.notice('%s\n -> %s', video.relative_to(root), new_name)
-            video.rename(target)
-            renamed_any = True
-    if renamed_any:
-        log.info('Sleeping 5 seconds after renaming')
-        time.sleep(5)
-
-
-def flatten(root: Path, dst_dir: Path) -> None:  # noqa: C901, PLR0912, PLR0915
+        all_renames += planned_renames
+    if not all_renames:
+        return entries
+    for video, _, new_name in all_renames:
+        log.notice('%s\n -> %s', video.relative_to(root), new_name)
+    _execute_moves([(video, target) for video, target, _ in all_renames])
+    log.info('Sleeping 5 seconds after renaming')
+    time.sleep(5)
+    renamed = {video: target for video, target, _ in all_renames}
+    return [renamed.get(entry, entry) for entry in entries]
+
+
+def flatten(root: Path, dst_dir: Path, entries: list[Path] | None = None) -> list[Path]:  # noqa: C901, PLR0912, PLR0915
     flattened_any = False
     if not root.is_dir():
         msg = f'{root} is not a directory'
         raise ValueError(msg)
-    exist_avids = {get_avid(f.name) for f in root.iterdir() if is_video(f)}
-    for folder in root.iterdir():
-        if not folder.is_dir():
-            continue
-        videos = [f for f in folder.iterdir() if is_video(f) and f.stat().st_size > cfg.min_size * 1024 * 1024]
+    if entries is None:
+        entries = _list_entries(root)
+    # one pass over the listing: partition into videos (for exist_avids) and subfolders
+    root_folders: list[Path] = []
+    other_entries: list[Path] = []
+    exist_avids: set[str] = set()
+    for entry in entries:
+        if entry.is_dir():
+            root_folders.append(entry)
+        else:
+            other_entries.append(entry)
+            if is_video(entry):
+                exist_avids.add(get_avid(entry.name))
+    removed_folders: set[Path] = set()
+    moved_in: list[Path] = []
+    min_bytes = cfg.min_size * 1024 * 1024
+    for folder in root_folders:
+        with os.scandir(folder) as it:
+            folder_entries = [(Path(entry.path), entry) for entry in it]
+        videos = [f for f, entry in folder_entries if is_video(f) and entry.stat().st_size > min_bytes]
         if len(videos) == 0:
             folder_avid = get_avid(folder.name)
             log.info('%s has no video files larger than %dMB', folder.name, cfg.min_size)
@@ -181,13 +251,14 @@ def flatten(root: Path, dst_dir: Path) -> None:  # noqa: C901, PLR0912, PLR0915
             folder_avid_dst_dir = find_dst_dir(folder_avid, dst_dir)
             if folder_avid_dst_dir is None or not folder_avid_dst_dir.exists():
                 continue
-            for f in folder_avid_dst_dir.iterdir():
+            for f in _list_entries(folder_avid_dst_dir):
                 if not is_video(f) or not f.name.startswith(folder_avid):
                     continue
                 # Intentional cleanup: folders without a qualifying video are
                 # treated as disposable leftovers, usually ads or junk files.
                 log.warning('%s has no video and %s exists (%s), deleting', folder.name, folder_avid, f)
                 shutil.rmtree(folder)
+                removed_folders.add(folder)
                 break
             continue
         videos = drop_duplicate_copies(folder, videos)
@@ -196,9 +267,9 @@ def flatten(root: Path, dst_dir: Path) -> None:  # noqa: C901, PLR0912, PLR0915
         if len(set(avids)) != 1:
             log.warning(
                 'multiple avid result: %s found in %s in %s, skipping',
-                ', '.join(avids),
+                _LazyJoin(', ', avids),
                 folder.name,
-                ', '.join([t.name for t in videos]),
+                _LazyJoin(', ', [t.name for t in videos]),
             )
             continue
         avid = avids[0]
@@ -213,13 +284,13 @@ def flatten(root: Path, dst_dir: Path) -> None:  # noqa: C901, PLR0912, PLR0915
                     log.warning('4k video avid mismatch in %s, skipping', folder.name)
                     continue
                 dropped = [v.name for v in videos if v != kept]
-                log.info('4k variant found in %s, keeping %s and dropping %s', folder.name, kept.name, ', '.join(dropped))
+                log.info('4k variant found in %s, keeping %s and dropping %s', folder.name, kept.name, _LazyJoin(', ', dropped))
                 videos = [kept]
             else:
                 log.warning('multiple videos found, but seems not multi-part video, skipping %s', folder.name)
                 continue
         if not avid:
-            log.warning('failed to get avid for %s, skipping folder', ', '.join([t.name for t in videos]))
+            log.warning('failed to get avid for %s, skipping folder', _LazyJoin(', ', [t.name for t in videos]))
             continue
         avid = remove_00(avid)
         if avid in exist_avids:
@@ -233,44 +304,51 @@ def flatten(root: Path, dst_dir: Path) -> None:  # noqa: C901, PLR0912, PLR0915
                 msg = f'{dst} exists'
                 raise FileExistsError(msg)
             v.rename(dst)
+            moved_in.append(dst)
         shutil.rmtree(folder)
+        removed_folders.add(folder)
         flattened_any = True
     if flattened_any:
         log.info('Sleeping 5 seconds after flattening')
         time.sleep(5)
+    return other_entries + moved_in + [folder for folder in root_folders if folder not in removed_folders]
 
 
-def clear_dirname(root: Path) -> None:
-    for folder in root.iterdir():
-        if not folder.is_dir():
+def clear_dirname(root: Path, entries: list[Path] | None = None) -> list[Path]:
+    if entries is None:
+        entries = _list_entries(root)
+    updated: list[Path] = []
+    for folder in entries:
+        if not folder.is_dir() or not has_video_suffix(folder):
+            updated.append(folder)
             continue
-        if has_video_suffix(folder):
-            new_name = folder.stem + folder.suffix.replace('.', '-')
-            log.info('clearing dirname for %s -> %s', folder.name, new_name)
-            new_path = root / new_name
-            counter = 1
-            while new_path.exists():
-                new_name_with_counter = new_name + f'-{counter}'
-                log.info('%s exists, trying %s', new_name, new_name_with_counter)
-                new_path = root / new_name_with_counter
-                counter += 1
-                if counter > MAX_RENAME_ATTEMPTS:
-                    break
-            if new_path.exists():
-                log.warning('failed to clear dirname for %s, skipping', folder.name)
-                continue
-            folder.rename(new_path)
+        new_name = folder.stem + folder.suffix.replace('.', '-')
+        log.info('clearing dirname for %s -> %s', folder.name, new_name)
+        new_path = root / new_name
+        counter = 1
+        while new_path.exists():
+            new_name_with_counter = new_name + f'-{counter}'
+            log.info('%s exists, trying %s', new_name, new_name_with_counter)
+            new_path = root / new_name_with_counter
+            counter += 1
+            if counter > MAX_RENAME_ATTEMPTS:
+                break
+        if new_path.exists():
+            log.warning('failed to clear dirname for %s, skipping', folder.name)
+            updated.append(folder)
+            continue
+        folder.rename(new_path)
+        updated.append(new_path)
+    return updated
 
 
 def find_dst_dir(avid: str, dst_dir: Path) -> Path | None:
-    brand = get_brand(avid)
-    if not brand:
+    if not (brand := get_brand(avid)):
         log.warning('failed to get brand for %s, skipping find_dst', avid)
         return None
     # check if in brand_mapping
-    for brand_dst, brand_avids in cfg.brand_mapping.items():
-        if brand in brand_avids:
-            return cfg.dst_dir / brand_dst / brand
+    if (brand_dst := _get_brand_index().get(brand)) is not None:
+        return cfg.dst_dir / brand_dst / brand
     return dst_dir / brand
 
 
@@ -286,7 +364,7 @@ def find_video_dst(video: Path, dst_dir: Path) -> Path | None:
     return video_dst_dir / video.name
 
 
-def archive(src_dir: Path, dst_dir: Path) -> None:
+def archive(src_dir: Path, dst_dir: Path, entries: list[Path] | None = None) -> None:
     if not src_dir.is_dir():
         msg = f'{src_dir} is not a directory'
         raise ValueError(msg)
@@ -294,16 +372,22 @@ def archive(src_dir: Path, dst_dir: Path) -> None:
         msg = f'{dst_dir} is not a directory'
         raise ValueError(msg)
 
-    for video in src_dir.iterdir():
+    if entries is None:
+        entries = _list_entries(src_dir)
+    dst_root = cfg.dst_dir
+    moves: list[tuple[Path, Path]] = []
+    for video in entries:
         if not (dst := find_video_dst(video, dst_dir)):
             continue
         if not dst.parent.exists():
             dst.parent.mkdir(parents=True)
         if dst.exists():
-            log.warning('%s exists, skipping', _safe_relative(dst, cfg.dst_dir))
+            log.warning('%s exists, skipping', _safe_relative(dst, dst_root))
             continue
-        log.notice('moving %s to %s', video.relative_to(src_dir), _safe_relative(dst, cfg.dst_dir))
-        video.rename(dst)
+        log.notice('moving %s to %s', video.relative_to(src_dir), _safe_relative(dst, dst_root))
+        moves.append((video, dst))
+    if moves:
+        _execute_moves(moves)
 
 
 def main() -> None:
@@ -314,10 +398,12 @@ def main() -> None:
         src_path = cfg.src_dir / src
         dst_path = cfg.dst_dir / dst
         log.info('processing %s -> %s', src_path, dst_path)
-        clear_dirname(src_path)
-        flatten(src_path, dst_path)
-        rename(src_path)
-        archive(src_path, dst_path)
+        # each phase hands its updated listing to the next so the source tree
+        # is read from disk only once per run
+        entries = clear_dirname(src_path)
+        entries = flatten(src_path, dst_path, entries)
+        entries = rename(src_path, entries)
+        archive(src_path, dst_path, entries)
 
 
 if __name__ == '__main__':
@@ -123,4 +123,21 @@ def _build_test_config() -> Config:
     )
 
 
-config = _build_test_config() if _use_test_config() else Config()
+_config: Config | None = None
+
+
+def _load_config() -> Config:
+    global _config
+    if _config is None:
+        _config = _build_test_config() if _use_test_config() else Config()
+    return _config
+
+
+class _ConfigProxy:
+    """Defer Config construction (TOML/env parsing) until a section is first accessed."""
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(_load_config(), name)
+
+
+config: Any = _ConfigProxy()
@@ -1,6 +1,9 @@
 import asyncio
+import errno
 import importlib
+import os
 import re
+import shutil
 import sys
 from collections.abc import Coroutine
 from pathlib import Path
@@ -13,16 +16,50 @@ from src.utils import get_brand, magnet, web
 log = logger.get('fill_actor')
 cfg = config.fill_actor
 
+CHECK_CONCURRENCY = 32
+TS_SUFFIX_RE = re.compile(r'(.+)_\d{4}-\d{2}-\d{2}')
+
+
+def _matches_avid(name: str, avid: str) -> bool:
+    """Plain-string equivalent of matching avid(?:-cd\\d{1,2})?\\..+ against name, case-sensitively."""
+    if not name.startswith(avid):
+        return False
+    rest = name[len(avid):]
+    if rest.startswith('-cd'):
+        digits = rest[3:5] if rest[4:5].isdigit() else rest[3:4]
+        if not digits.isdigit():
+            return False
+        rest = rest[3 + len(digits):]
+    return len(rest) > 1 and rest[0] == '.'
+
+
+# one readdir per brand directory per run instead of one per avid; many avids
+# of the same actor share a brand. None marks a missing directory. Duplicate
+# scans from concurrent threads are benign.
+_dir_listing_cache: dict[str, list[tuple[str, str]] | None] = {}
+
+
+def _list_brand_dir(brand_path: Path) -> list[tuple[str, str]] | None:
+    key = str(brand_path)
+    if key not in _dir_listing_cache:
+        if brand_path.exists():
+            with os.scandir(brand_path) as it:
+                _dir_listing_cache[key] = [(entry.path, entry.name) for entry in it]
+        else:
+            _dir_listing_cache[key] = None
+    return _dir_listing_cache[key]
+
+
 def find_exists_in_actor(avid: str) -> list[Path]:
     avid = avid.upper()
     brand = get_brand(avid)
     brand_path = cfg.actor_brand_path / brand
     log.info('Checking %s', brand_path)
-    if not brand_path.exists():
+    entries = _list_brand_dir(brand_path)
+    if entries is None:
         log.info('No such directory: %s', brand_path)
         return []
-    avid_paths = list(brand_path.iterdir())
-    return [p for p in avid_paths if re.match(avid + r'(?:-cd\d{1,2})?\..+', p.name)]
+    return [Path(path) for path, name in entries if _matches_avid(name, avid)]
 
 def find_exists_in_additional(avid: str) -> list[Path]:
     avid = avid.upper()
@@ -31,27 +68,35 @@ def find_exists_in_additional(avid: str) -> list[Path]:
     for p in cfg.additional_brand_path:
         brand_path = p / brand
         log.info('Checking %s', brand_path)
-        if not brand_path.exists():
+        entries = _list_brand_dir(brand_path)
+        if entries is None:
             log.info('No such directory: %s', brand_path)
             continue
-        avid_paths = list(brand_path.iterdir())
-        result += [p for p in avid_paths if re.match(avid + r'(?:-cd\d{1,2})?\..+', p.name)]
+        result += [Path(path) for path, name in entries if _matches_avid(name, avid)]
     return result
 
 async def main(actor_ids: list[str]) -> None:  # noqa: C901, PLR0912, PLR0915
     if isinstance(actor_ids, str):
         actor_ids = [actor_ids]
+    _dir_listing_cache.clear()
     non_exists: set[str] = set()
-    for actor_id in actor_ids:
-        log.info('Scraping %s from javbus', actor_id)
-        res = await web.javbus.scrape(actor_id)
-        res = set(res)
-        log.info('Found %d videos', len(res))
-        log.info('Checking if videos exist in actor folder')
-        for r in res:
-            r_clean = match.group(1) if (match := re.match(r'(.+)_\d{4}-\d{2}-\d{2}', r)) else r
-            if not find_exists_in_actor(r_clean):
-                non_exists.add(r_clean)
+    log.info('Scraping %d actors from javbus', len(actor_ids))
+    scrape_results = await asyncio.gather(*(web.javbus.scrape(actor_id) for actor_id in actor_ids))
+    to_check: set[str] = set()
+    for actor_id, res in zip(actor_ids, scrape_results, strict=True):
+        unique = set(res)
+        log.info('Found %d videos for %s', len(unique), actor_id)
+        for r in unique:
+            to_check.add(match.group(1) if (match := TS_SUFFIX_RE.match(r)) else r)
+    log.info('Checking if videos exist in actor folder')
+    check_semaphore = asyncio.Semaphore(CHECK_CONCURRENCY)
+
+    async def check_one(avid: str) -> None:
+        async with check_semaphore:
+            if not await asyncio.to_thread(find_exists_in_actor, avid):
+                non_exists.add(avid)
+
+    await asyncio.gather(*(check_one(avid) for avid in to_check))
     if not non_exists:
         log.info('All exists')
         return
@@ -62,7 +107,7 @@ async def main(actor_ids: list[str]) -> None:  # noqa: C901, PLR0912, PLR0915
         find = find_exists_in_additional(avid)
         if find:
             avid_video[avid] = find
-            log.notice(f'{avid} found in additional:\n - {"\n - ".join(str(i) for i in find)}')
+            log.notice('%s found in additional:\n - %s', avid, '\n - '.join(str(i) for i in find))
     move: list[Path] = []
     for avid in non_exists.copy():
         if avid in avid_video:
@@ -73,11 +118,18 @@ async def main(actor_ids: list[str]) -> None:  # noqa: C901, PLR0912, PLR0915
         if input() == 'y':
             for i in move:
                 dst = cfg.move_in_path / i.name
-                if dst.exists():
+                if os.path.lexists(dst):
                     log.warning('%s exists, skipping move for %s', dst, i)
                     continue
                 log.info('Moving %s to %s', i, dst)
-                i.rename(dst)
+                try:
+                    i.replace(dst)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    # additional brand paths can sit on another mount;
+                    # shutil.move takes the kernel fastcopy path there
+                    shutil.move(str(i), str(dst))
         else:
             log.warning('Skip move')
     # online
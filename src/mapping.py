@@ -1,9 +1,14 @@
 import filecmp
+import functools
+import os
 import shutil
+import stat
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 
-from pydantic import BaseModel
-
 from src.core import config, logger
 from src.utils import get_avid
 
@@ -11,7 +16,8 @@ log = logger.get('mapping')
 cfg = config.mapping
 
 
-class Counter(BaseModel):
+@dataclass(slots=True)
+class Counter:
     files_processed: int = 0
     files_updated: int = 0
     files_skipped: int = 0
@@ -20,6 +26,23 @@ class Counter(BaseModel):
 
 
 counter = Counter()
+# guards counter increments when update_many fans out across threads
+counter_lock = threading.Lock()
+
+SMALL_COPY_BYTES = 256 * 1024
+UPDATE_WORKERS = 16
+
+
+def _copy_strm(src: Path, dst: Path, st: os.stat_result | None = None) -> None:
+    # strm files are tiny; one read + one write beats shutil.copy2's buffered
+    # loop and full copystat, and we only need mtime preserved for the skip check
+    if st is None:
+        st = src.stat()
+    if st.st_size <= SMALL_COPY_BYTES:
+        dst.write_bytes(src.read_bytes())
+    else:
+        shutil.copyfile(src, dst)
+    os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
 
 
 def reset_counter() -> None:
@@ -27,12 +50,19 @@ def reset_counter() -> None:
     counter = Counter()
 
 
+@functools.lru_cache(maxsize=64)
+def _absolute_dir(path: Path) -> Path:
+    # Path.absolute() calls getcwd every time; the handful of root dirs we
+    # compare against are stable for the life of the process
+    return path.absolute()
+
+
 def _relative_to_src(src: Path, src_dir: Path) -> Path | None:
     try:
         return src.relative_to(src_dir)
     except ValueError:
         try:
-            return src.absolute().relative_to(src_dir.absolute())
+            return src.absolute().relative_to(_absolute_dir(src_dir))
         except ValueError:
             return None
 
@@ -50,36 +80,51 @@ def map_strm_path(src: Path, src_dir: Path, dst_dir: Path) -> Path | None:
     return dst_dir / rel_path.parent / avid / src.name
 
 
-def update_one(src: Path, src_dir: Path, dst_dir: Path) -> None:
-    dst = map_strm_path(src, src_dir, dst_dir)
+def _safe_relative(path: Path, base: Path) -> Path:
+    try:
+        return path.relative_to(base)
+    except ValueError:
+        return path
+
+
+def _dst_up_to_date(src: Path, dst: Path, src_stat: os.stat_result) -> bool:
+    # one stat instead of exists/is_file/stat round-trips
+    try:
+        dst_stat = dst.stat()
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISREG(dst_stat.st_mode):
+        msg = f'{dst} exists and is not a file'
+        raise FileExistsError(msg)
+    return src_stat.st_mtime <= dst_stat.st_mtime and filecmp.cmp(src, dst, shallow=False)
+
+
+def update_one(src: Path, src_dir: Path, dst_dir: Path, dst: Path | None = None, created_dirs: set[str] | None = None) -> None:
+    if dst is None:
+        dst = map_strm_path(src, src_dir, dst_dir)
     if not dst:
         return
-    if not src.exists():
+    try:
+        src_stat = src.stat()
+    except FileNotFoundError:
         log.warning('source file missing, skipping %s', src)
         return
-    dst.parent.mkdir(parents=True, exist_ok=True)
-    if dst.exists() and not dst.is_file():
-        msg = f'{dst} exists and is not a file'
-        raise FileExistsError(msg)
-    if dst.exists() and src.stat().st_mtime <= dst.stat().st_mtime and filecmp.cmp(src, dst, shallow=False):
-        counter.files_skipped += 1
-        try:
-            rel_src = src.relative_to(src_dir)
-        except ValueError:
-            rel_src = src
-        log.debug('skipping %s (unchanged)', rel_src)
+    # callers that process many files pass a shared set so each avid directory
+    # only pays for one mkdir syscall
+    parent = str(dst.parent)
+    if created_dirs is None or parent not in created_dirs:
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        if created_dirs is not None:
+            created_dirs.add(parent)
+    if _dst_up_to_date(src, dst, src_stat):
+        with counter_lock:
+            counter.files_skipped += 1
+        log.debug('skipping %s (unchanged)', _safe_relative(src, src_dir))
         return
-    shutil.copy2(src, dst)
-    counter.files_updated += 1
-    try:
-        rel_src = src.relative_to(src_dir)
-    except ValueError:
-        rel_src = src
-    try:
-        rel_dst = dst.relative_to(dst_dir)
-    except ValueError:
-        rel_dst = dst
-    log.info('updated %s -> %s', rel_src, rel_dst)
+    _copy_strm(src, dst, src_stat)
+    with counter_lock:
+        counter.files_updated += 1
+    log.info('updated %s -> %s', _safe_relative(src, src_dir), _safe_relative(dst, dst_dir))
 
 
 def delete_empty_dirs_for_path(path: Path, dst_dir: Path) -> None:
@@ -105,55 +150,104 @@ def delete_one(src: Path, src_dir: Path, dst_dir: Path) -> None:
         return
     dst.unlink()
     counter.files_deleted += 1
-    try:
-        rel_dst = dst.relative_to(dst_dir)
-    except ValueError:
-        rel_dst = dst
-    log.info('deleted %s', rel_dst)
+    log.info('deleted %s', _safe_relative(dst, dst_dir))
     delete_empty_dirs_for_path(dst.parent, dst_dir)
 
 
-def update(src_dir: Path, dst_dir: Path) -> None:
+def _iter_strm_files(root: Path) -> Iterator[Path]:
+    # os.walk batches the readdir/stat work that glob('**/*.strm') would redo per entry
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith('.strm'):
+                yield Path(dirpath, filename)
+
+
+def update_many(paths: Iterable[Path], src_dir: Path, dst_dir: Path) -> set[Path]:
     """
-    Map .strm files from src_dir with structure xx/yy/zz.strm
-    to dst_dir with structure xx/yy/zz/zz.strm
+    Update a batch of source files, sharing the created-directory cache across
+    the batch. Returns the paths that failed.
+    """
+    failed: set[Path] = set()
+    created_dirs: set[str] = set()
+    to_update = list(paths)
+    if not to_update:
+        return failed
+    # update_one is stat/copy bound, so overlap the syscalls across threads;
+    # created_dirs races are benign (mkdir stays exist_ok)
+    with ThreadPoolExecutor(max_workers=min(UPDATE_WORKERS, len(to_update))) as executor:
+        futures = {executor.submit(update_one, path, src_dir, dst_dir, created_dirs=created_dirs): path for path in to_update}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                future.result()
+            except Exception:
+                log.exception('update failed for %s', path)
+                failed.add(path)
+    return failed
+
+
+def delete_many(paths: Iterable[Path], src_dir: Path, dst_dir: Path) -> set[Path]:
+    """
+    Delete a batch of source files' mappings. Returns the paths that failed.
+    Kept serial: concurrent deletes racing the empty-parent pruning would trip
+    over each other's rmdir calls.
     """
-    for src in src_dir.glob('**/*.strm'):
-        update_one(src, src_dir, dst_dir)
+    failed: set[Path] = set()
+    for path in paths:
+        try:
+            delete_one(path, src_dir, dst_dir)
+        except Exception:
+            log.exception('delete failed for %s', path)
+            failed.add(path)
+    return failed
 
 
-def delete(dst_dir: Path, src_dir: Path) -> None:
+def update(src_dir: Path, dst_dir: Path) -> set[str]:
     """
-    Delete .strm files xx/yy/zz/zz.strm from dst_dir that xx/yy/zz.strm are not in src_dir
+    Map .strm files from src_dir with structure xx/yy/zz.strm
+    to dst_dir with structure xx/yy/zz/zz.strm
+
+    Returns the set of expected destination paths, for delete_stale.
     """
-    for dst in dst_dir.glob('**/*.strm'):
-        src_rel_dir = dst.relative_to(dst_dir).parent.parent
-        src = src_dir / src_rel_dir / dst.name
-        if not src.exists():
-            dst.unlink()
-            counter.files_deleted += 1
-            log.info('deleted %s', dst.relative_to(dst_dir))
+    expected: set[str] = set()
+    created_dirs: set[str] = set()
+    for src in _iter_strm_files(src_dir):
+        dst = map_strm_path(src, src_dir, dst_dir)
+        if not dst:
+            continue
+        expected.add(str(dst))
+        update_one(src, src_dir, dst_dir, dst, created_dirs)
+    return expected
 
 
-def delete_empty_dirs(dst_dir: Path) -> None:
+def delete_stale(dst_dir: Path, expected: set[str]) -> None:
     """
-    Delete empty directories in dst_dir
+    Delete .strm files from dst_dir that the current mapping did not produce,
+    and prune directories left without any descendant .strm, in one bottom-up walk.
     """
     # Intentional cleanup: directories without descendant .strm files are removed
     # as derived mapping output, even if non-.strm leftovers are still present.
-    empty_dirs = [p for p in dst_dir.glob('**/*') if p.is_dir() and not any(p.glob('**/*.strm'))]
-    if not empty_dirs:
-        return
-
-    # Sort in reverse order to delete deepest directories first
-    empty_dirs.sort(reverse=True)
-    log.notice('deleting directories:\n%s', '\n'.join([str(d.relative_to(dst_dir)) for d in empty_dirs]))
-
-    # process deletion
-    for empty_dir in empty_dirs:
-        shutil.rmtree(empty_dir)
-        counter.dirs_deleted += 1
-        log.info('deleted empty directory: %s', empty_dir.relative_to(dst_dir))
+    dst_root = str(dst_dir)
+    has_strm: set[str] = set()
+    for root, dirs, files in os.walk(dst_root, topdown=False):
+        root_path = Path(root)
+        keeps_strm = False
+        for name in files:
+            if not name.endswith('.strm'):
+                continue
+            path = root_path / name
+            if str(path) in expected:
+                keeps_strm = True
+                continue
+            path.unlink()
+            counter.files_deleted += 1
+            log.info('deleted %s', path.relative_to(dst_dir))
+        if keeps_strm or any(str(root_path / d) in has_strm for d in dirs):
+            has_strm.add(root)
+        elif root != dst_root:
+            shutil.rmtree(root)
+            counter.dirs_deleted += 1
+            log.info('deleted empty directory: %s', os.path.relpath(root, dst_root))
 
 
 def main() -> None:
@@ -183,9 +277,8 @@ def main() -> None:
         msg = f'{dst_dir} is not a directory'
         raise ValueError(msg)
 
-    update(src_dir, dst_dir)
-    delete(dst_dir, src_dir)
-    delete_empty_dirs(dst_dir)
+    expected = update(src_dir, dst_dir)
+    delete_stale(dst_dir, expected)
 
     log.info('files updated: %d', counter.files_updated)
     log.info('files skipped (unchanged): %d', counter.files_skipped)
@@ -1,8 +1,8 @@
+import asyncio
+import os
 import re
-import shutil
-import subprocess
 import sys
-import tempfile
+from collections.abc import Iterator
 from pathlib import Path
 
 from src.core import config, logger
@@ -12,75 +12,92 @@ log = logger.get('merge')
 
 MIN_ARGS = 3
 CD_INDEX_RE = re.compile(r'-cd(\d+)\.strm$', re.IGNORECASE)
+# ffmpeg -c copy is demux/mux only, so a few concurrent jobs keep the disk busy
+MERGE_CONCURRENCY = min(4, os.cpu_count() or 1)
 
 
-def _cd_index(path: Path) -> int:
-    match = CD_INDEX_RE.search(path.name)
-    if match is None:
-        msg = f'{path} is not a CD strm file'
-        raise ValueError(msg)
-    return int(match.group(1))
+def _walk_strm(root: str) -> Iterator[os.DirEntry]:
+    # scandir recursion: entry types come back with the listing, and non-strm
+    # entries never become Path objects
+    with os.scandir(root) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_strm(entry.path)
+            elif entry.name.lower().endswith('.strm'):
+                yield entry
 
 
 def get_cds(search_dir: Path, filter_pattern: str) -> dict[str, list[Path]]:
-    cds: list[Path] = []
-    for root, _, files in search_dir.walk():
-        cds += [root / f for f in files if CD_INDEX_RE.search(f)]
-    avid_cds: dict[str, list[Path]] = {}
-    for cd in cds:
+    # match each filename once and carry the parsed index along instead of
+    # re-searching in the sort key and the range check
+    cds: list[tuple[Path, int]] = [
+        (Path(entry.path), int(match.group(1)))
+        for entry in _walk_strm(str(search_dir))
+        if (match := CD_INDEX_RE.search(entry.name))
+    ]
+    filter_re = re.compile(filter_pattern) if filter_pattern else None
+    avid_cds: dict[str, list[tuple[Path, int]]] = {}
+    for cd, index in cds:
         avid = get_avid(cd.name)
-        if filter_pattern and not re.search(filter_pattern, avid):
+        if filter_re and not filter_re.search(avid):
             continue
-        if avid not in avid_cds:
-            avid_cds[avid] = []
-        avid_cds[avid].append(cd)
+        avid_cds.setdefault(avid, []).append((cd, index))
     # sort cds and verify range
-    invalid_avids = []
-    for avid, cd_paths in avid_cds.items():
-        cd_paths.sort(key=_cd_index)
-        indexes = [_cd_index(cd) for cd in cd_paths]
-        if sorted(indexes) != list(range(1, max(indexes) + 1)):
+    result: dict[str, list[Path]] = {}
+    for avid, pairs in avid_cds.items():
+        pairs.sort(key=lambda pair: pair[1])
+        indexes = [index for _, index in pairs]
+        if indexes != list(range(1, max(indexes) + 1)):
             log.error('%s has missing CD, skip', avid)
-            invalid_avids.append(avid)
-    for avid in invalid_avids:
-        del avid_cds[avid]
-    return avid_cds
+            continue
+        result[avid] = [cd for cd, _ in pairs]
+    return result
 
 
-def merge(cds: list[Path], dst: Path) -> bool:
+async def merge(cds: list[Path], dst: Path) -> bool:
     if dst.exists():
         log.warning('%s already exists, skip', dst)
         return False
-    tmp_dir_ctx = tempfile.TemporaryDirectory(prefix='embyx-monitor-merge-', dir='./data')
-    tmp_dir_path = Path(tmp_dir_ctx.name)
-    txt_path = tmp_dir_path / 'merge.txt'
-    tmp_output_path = tmp_dir_path / 'output.mp4'
+    # concat list goes in over stdin and the output lands next to dst as a
+    # .part file, so no tempdir round-trip and the final publish is one rename
+    tmp_output_path = dst.with_name(dst.name + '.part')
+    # run ffmpeg from the cds' common parent so the concat list holds short
+    # relative paths; single-quote each entry (concat syntax) so spaces and
+    # quotes in filenames survive
+    common = os.path.commonpath([cd.parent for cd in cds])
+    quoted = ("'" + os.path.relpath(cd, common).replace("'", "'\\''") + "'" for cd in cds)
+    concat_list = '\n'.join([f'file {entry}' for entry in quoted]).encode()
     try:
-        txt_path.write_text('\n'.join([f'file {cd}' for cd in cds]))
         cmd = [
             'ffmpeg',
             '-hide_banner',
+            '-loglevel', 'error',
             '-f', 'concat',
             '-safe', '0',
-            '-i', str(txt_path),
+            '-protocol_whitelist', 'file,pipe',
+            '-seekable', '0',
+            '-thread_queue_size', '1024',
+            '-fflags', '+genpts',
+            '-avoid_negative_ts', 'make_zero',
+            '-i', 'pipe:0',
             '-c', 'copy',
-            str(tmp_output_path),
+            '-movflags', '+faststart',
+            '-max_muxing_queue_size', '1024',
+            '-y', os.fspath(tmp_output_path.absolute()),
         ]
-        result = subprocess.run(cmd, check=False)  # noqa: S603
-        if result.returncode != 0:
-            log.error('failed to merge %s: return code %d', cds, result.returncode)
+        process = await asyncio.create_subprocess_exec(*cmd, stdin=asyncio.subprocess.PIPE, cwd=common)
+        await process.communicate(concat_list)
+        if process.returncode != 0:
+            log.error('failed to merge %s: return code %d', cds, process.returncode)
             return False
         log.info('moving %s to %s', tmp_output_path, dst)
-        shutil.move(tmp_output_path, dst)
+        tmp_output_path.replace(dst)
         log.info('done')
-    except subprocess.CalledProcessError:
-        log.exception('failed to merge %s', cds)
-        return False
     except KeyboardInterrupt:
-        log.warning('keyboard interrupt while merging %s, removing %s', cds, tmp_dir_path)
+        log.warning('keyboard interrupt while merging %s, removing %s', cds, tmp_output_path)
         raise
     finally:
-        tmp_dir_ctx.cleanup()
+        tmp_output_path.unlink(missing_ok=True)
     return True
 
 
@@ -95,15 +112,31 @@ def main(search_dir: Path, dst_dir: Path, filter_pattern: str) -> None:
 
     avid_cds = get_cds(search_path, filter_pattern)
     log.notice('find %d avids to merge', len(avid_cds))
-    for avid, cds in avid_cds.items():
-        log.notice('avid: %s, cds: %s', avid, ', '.join([cd.name for cd in cds]))
-    for avid, cds in avid_cds.items():
-        log.notice('start merging %s', avid)
-        real_cds = [Path(cd.read_text()) for cd in cds]
-        success = merge(real_cds, dst_dir / f'{avid}.mp4')
-        if success:
-            for real_cd in real_cds:
-                real_cd.unlink()
+    if log.isEnabledFor(logger.NOTICE):
+        for avid, cds in avid_cds.items():
+            log.notice('avid: %s, cds: %s', avid, ', '.join(cd.name for cd in cds))
+    asyncio.run(_merge_all(avid_cds, dst_dir))
+
+
+async def _merge_all(avid_cds: dict[str, list[Path]], dst_dir: Path) -> None:
+    semaphore = asyncio.Semaphore(MERGE_CONCURRENCY)
+
+    async def merge_one(avid: str, cds: list[Path]) -> None:
+        async with semaphore:
+            log.notice('start merging %s', avid)
+            # strm files are on a mounted tree, so overlap the small reads
+            try:
+                contents = await asyncio.gather(*(asyncio.to_thread(cd.read_text) for cd in cds))
+            except OSError:
+                log.exception('failed to read strm files for %s, skip', avid)
+                return
+            real_cds = [Path(content.strip()) for content in contents]
+            success = await merge(real_cds, dst_dir / f'{avid}.mp4')
+            if success:
+                for real_cd in real_cds:
+                    real_cd.unlink()
+
+    await asyncio.gather(*(merge_one(avid, cds) for avid, cds in avid_cds.items()))
 
 
 if __name__ == '__main__':
@@ -1,5 +1,6 @@
 import asyncio
 import importlib
+import os
 import signal
 import threading
 import time
@@ -29,32 +30,46 @@ FULL_SYNC_RETRY_SECONDS = 5 * 60
 SHUTDOWN_TIMEOUT_SECONDS = 10
 
 
+class EventState:
+    """Event bookkeeping shared between the handler and the mapping loop."""
+
+    __slots__ = ('event_count', 'last_event_time')
+
+    def __init__(self) -> None:
+        self.last_event_time = 0.0
+        self.event_count = 0
+
+
 class StrmChangeHandler(FileSystemEventHandler):
-    def __init__(  # noqa: PLR0913
+    def __init__(
         self,
         trigger_event: threading.Event,
-        last_event_time: dict[str, float],
-        event_counter: dict[str, int],
+        state: EventState,
         changed_paths: set[Path],
         deleted_paths: set[Path],
         lock: threading.Lock,
     ) -> None:
         self._trigger_event = trigger_event
-        self._last_event_time = last_event_time
-        self._event_counter = event_counter
+        self._state = state
         self._changed_paths = changed_paths
         self._deleted_paths = deleted_paths
         self._lock = lock
 
-    def _record_event(self, path: str | None, *, is_directory: bool, deleted: bool) -> None:
+    def _record_event(self, path: str | bytes | None, *, is_directory: bool, deleted: bool) -> None:
         if is_directory or not path:
             return
-        if Path(path).suffix.lower() != '.strm':
+        # plain suffix check: no PurePath allocation per event; watchdog can
+        # hand over bytes paths on some platforms
+        if isinstance(path, bytes):
+            if not path.lower().endswith(b'.strm'):
+                return
+            path = os.fsdecode(path)
+        elif not path.lower().endswith('.strm'):
             return
         path_obj = Path(path)
         with self._lock:
-            self._last_event_time['value'] = time.monotonic()
-            self._event_counter['value'] += 1
+            self._state.last_event_time = time.monotonic()
+            self._state.event_count += 1
             if deleted:
                 self._changed_paths.discard(path_obj)
                 self._deleted_paths.add(path_obj)
@@ -90,29 +105,18 @@ def run_mapping_full() -> bool:
 def run_mapping_incremental(changed_paths: set[Path], deleted_paths: set[Path]) -> tuple[set[Path], set[Path]]:
     if not changed_paths and not deleted_paths:
         return set(), set()
-    failed_changed: set[Path] = set()
-    failed_deleted: set[Path] = set()
     mapping.reset_counter()
     src_dir = mapping.cfg.src_dir
     dst_dir = mapping.cfg.dst_dir
-    for path in sorted(deleted_paths):
-        try:
-            mapping.delete_one(path, src_dir, dst_dir)
-        except Exception:  # noqa: BLE001
-            mapping_log.exception('Incremental delete failed for %s', path)
-            failed_deleted.add(path)
-    for path in sorted(changed_paths):
-        try:
-            mapping.update_one(path, src_dir, dst_dir)
-        except Exception:  # noqa: BLE001
-            mapping_log.exception('Incremental update failed for %s', path)
-            failed_changed.add(path)
+    failed_deleted = mapping.delete_many(deleted_paths, src_dir, dst_dir)
+    failed_changed = mapping.update_many(changed_paths, src_dir, dst_dir)
+    c = mapping.counter
     mapping_log.info(
         'Incremental mapping updated=%d skipped=%d deleted=%d dirs_deleted=%d',
-        mapping.counter.files_updated,
-        mapping.counter.files_skipped,
-        mapping.counter.files_deleted,
-        mapping.counter.dirs_deleted,
+        c.files_updated,
+        c.files_skipped,
+        c.files_deleted,
+        c.dirs_deleted,
     )
     return failed_changed, failed_deleted
 
@@ -131,13 +135,18 @@ async def run_update_once() -> None:
     archive.main()
 
 
-async def wait_for_stop(stop_event: threading.Event, timeout: float) -> bool:  # noqa: ASYNC109
+async def wait_for_stop(stop_event: asyncio.Event, timeout: float) -> bool:  # noqa: ASYNC109
+    # pure-coroutine wait: no thread bounce per sleep interval
     if timeout <= 0:
         return stop_event.is_set()
-    return await asyncio.to_thread(stop_event.wait, timeout)
+    try:
+        await asyncio.wait_for(stop_event.wait(), timeout)
+    except TimeoutError:
+        return False
+    return True
 
 
-async def run_update_loop(stop_event: threading.Event) -> None:
+async def run_update_loop(stop_event: asyncio.Event) -> None:
     update_log.info('Starting update loop with %d second interval', RUN_INTERVAL_SECONDS)
     while not stop_event.is_set():
         start = time.monotonic()
@@ -157,15 +166,13 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
     mapping_log.info('Starting mapping monitor')
     src_dir = mapping.cfg.src_dir
     trigger_event = threading.Event()
-    last_event_time = {'value': 0.0}
-    event_counter = {'value': 0}
+    state = EventState()
     changed_paths: set[Path] = set()
     deleted_paths: set[Path] = set()
     lock = threading.Lock()
     handler = StrmChangeHandler(
         trigger_event,
-        last_event_time,
-        event_counter,
+        state,
         changed_paths,
         deleted_paths,
         lock,
@@ -173,6 +180,14 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
     observer = Observer()
     observer.schedule(handler, str(src_dir), recursive=True)
     observer.start()
+    # wake the event wait below on shutdown so the loop can block until the
+    # next event or full-sync deadline instead of polling every 0.5s
+    stop_waker = threading.Thread(
+        target=lambda: (stop_event.wait(), trigger_event.set()),
+        name='mapping-monitor-stop-waker',
+        daemon=True,
+    )
+    stop_waker.start()
     try:
         while not stop_event.is_set() and not run_mapping_full():
             mapping_log.info('Retrying mapping in %d seconds', DEBOUNCE_SECONDS)
@@ -183,12 +198,12 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
         while not stop_event.is_set():
             if time.monotonic() >= next_full_sync:
                 with lock:
-                    counter_before = event_counter['value']
+                    counter_before = state.event_count
                 mapping_log.info('Running scheduled full mapping sync')
                 success = run_mapping_full()
                 cleared = False
                 with lock:
-                    counter_after = event_counter['value']
+                    counter_after = state.event_count
                     if should_clear_full_sync(
                         success=success,
                         counter_before=counter_before,
@@ -203,11 +218,15 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
                 interval = FULL_SYNC_INTERVAL_SECONDS if success else FULL_SYNC_RETRY_SECONDS
                 next_full_sync = time.monotonic() + interval
                 continue
-            if not trigger_event.wait(timeout=0.5):
+            # block until an event arrives (or stop fires via the waker),
+            # capped at the full-sync deadline
+            if not trigger_event.wait(timeout=next_full_sync - time.monotonic()):
                 continue
+            if stop_event.is_set():
+                break
             while not stop_event.is_set():
                 with lock:
-                    last_seen = last_event_time['value']
+                    last_seen = state.last_event_time
                 since = time.monotonic() - last_seen
                 if since < DEBOUNCE_SECONDS:
                     if stop_event.wait(timeout=DEBOUNCE_SECONDS - since):
@@ -219,7 +238,7 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
                     deleted_snapshot = set(deleted_paths)
                     changed_paths.clear()
                     deleted_paths.clear()
-                    counter_snapshot = event_counter['value']
+                    counter_snapshot = state.event_count
                 if changed_snapshot or deleted_snapshot:
                     mapping_log.info('Detected changes in %s, running incremental mapping', src_dir)
                     failed_changed, failed_deleted = run_mapping_incremental(changed_snapshot, deleted_snapshot)
@@ -231,17 +250,17 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
                         with lock:
                             changed_paths.update(failed_changed)
                             deleted_paths.update(failed_deleted)
-                            last_event_time['value'] = time.monotonic()
+                            state.last_event_time = time.monotonic()
                         trigger_event.set()
                         break
                 with lock:
-                    last_after = last_event_time['value']
-                    counter_after = event_counter['value']
+                    last_after = state.last_event_time
+                    counter_after = state.event_count
                 if last_after > run_started or counter_after > counter_snapshot:
                     continue
                 trigger_event.clear()
                 with lock:
-                    if event_counter['value'] > counter_after or changed_paths or deleted_paths:
+                    if state.event_count > counter_after or changed_paths or deleted_paths:
                         trigger_event.set()
                         continue
                 break
@@ -252,18 +271,23 @@ def run_mapping_loop(stop_event: threading.Event) -> None:  # noqa: C901, PLR091
 
 async def main() -> None:
     main_log.info('Starting combined monitor')
+    loop = asyncio.get_running_loop()
+    # the mapping loop blocks in watchdog, so it keeps a threading.Event on a
+    # daemon thread; the update loop stays on this loop with an asyncio.Event
     stop_event = threading.Event()
+    async_stop = asyncio.Event()
 
     def handle_shutdown(signum, _frame) -> None:  # noqa: ANN001
         main_log.info('Received %s, shutting down', signal.Signals(signum).name)
         stop_event.set()
+        loop.call_soon_threadsafe(async_stop.set)
 
     signal.signal(signal.SIGTERM, handle_shutdown)
     signal.signal(signal.SIGINT, handle_shutdown)
 
     mapping_thread = threading.Thread(target=run_mapping_loop, args=(stop_event,), name='mapping-monitor', daemon=True)
     mapping_thread.start()
-    update_task = asyncio.create_task(run_update_loop(stop_event))
+    update_task = asyncio.create_task(run_update_loop(async_stop))
     try:
         await update_task
     except KeyboardInterrupt:
@@ -272,6 +296,7 @@ async def main() -> None:
         main_log.exception('Update loop crashed')
     finally:
         stop_event.set()
+        async_stop.set()
         if not update_task.done():
             try:
                 await asyncio.wait_for(update_task, timeout=SHUTDOWN_TIMEOUT_SECONDS)
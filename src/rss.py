@@ -1,10 +1,13 @@
 import asyncio
 import importlib
+import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
 import httpx
 from grpc import RpcError
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential, wait_random_exponential
 from tqdm.asyncio import tqdm_asyncio
 
 from src.core import config, logger
@@ -12,6 +15,17 @@ from src.utils import clouddrive, freshrss, get_avid, magnet, web
 
 log = logger.get('rss')
 COOLDOWN_SECONDS = 24 * 60 * 60
+TRANSIENT_COOLDOWN_SECONDS = 60 * 60
+# sukebei and javbus throttle internally, but without an outer bound the gather
+# still materializes thousands of in-flight tasks all queueing on their pools
+GET_MAGNET_CONCURRENCY = 10
+ADD_BATCH_DELAY_MAX = 60.0
+FRESHRSS_READ_CHUNK = 1000
+ADD_MAGNET_WORKERS = 5
+# survive process restarts: a cron rerun shouldn't repeat identical lookups
+MAGNET_CACHE_PATH = Path('data/magnet_cache.json')
+MAGNET_CACHE_TTL_SECONDS = 6 * 60 * 60
+MAGNET_CACHE_NEGATIVE_TTL_SECONDS = 60 * 60
 FAILED_AVID_COOLDOWN: dict[str, float] = {}
 CLOUDDRIVE_RETRY_EXCEPTIONS = (RpcError, httpx.HTTPError, httpx.TimeoutException)
 
@@ -58,12 +72,14 @@ def clear_finished_magnets() -> None:
 
 @retry(
     stop=stop_after_attempt(3),
-    wait=wait_exponential(multiplier=1, min=1, max=10),
+    # jittered so parallel callers don't retry in lockstep
+    wait=wait_random_exponential(multiplier=1, max=60),
     retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
     reraise=True,
 )
-def add_magnets(magnets: list[str]) -> dict[str, list[str]]:
-    results = []
+def add_magnets(magnets: list[str]) -> list[dict]:
+    if not magnets:
+        return []
     for link in magnets:
         if not isinstance(link, str):
             msg = f'Magnet link must be a string, but got {type(link)}'
@@ -71,53 +87,127 @@ def add_magnets(magnets: list[str]) -> dict[str, list[str]]:
         if not link.lower().startswith('magnet:'):
             msg = f'Magnet link must start with "magnet:", but got {link}'
             raise ValueError(msg)
+    # per-link adds are independent gRPC calls, so overlap them; executor.map
+    # keeps results aligned with the input order the caller zips against
+    with ThreadPoolExecutor(max_workers=min(ADD_MAGNET_WORKERS, len(magnets))) as executor:
+        return list(executor.map(_add_one_magnet, magnets))
+
+
+def _add_one_magnet(link: str) -> dict:
+    try:
+        res = clouddrive.add_offline_file(link, config.clouddrive.task_dir_path)
+    except RpcError as e:
+        if '任务已存在' in e.details():
+            log.warning('Duplicate magnet for %s', link)
+            return {'type': 'duplicate', 'link': link}
+        log.exception('Failed to add magnet to 115: %s: %s', link, e.details())
+        return {'type': 'failed', 'link': link, 'response': e.details()}
+    if res.success:
+        log.info('Added magnet to 115: %s', link)
+        return {'type': 'success', 'link': link}
+    log.error('Failed to add magnet to 115: %s: %s', link, res)
+    return {'type': 'failed', 'link': link, 'response': res}
+
+
+def _load_magnet_cache() -> dict[str, list]:
+    """avid -> [magnet or None, timestamp]; expired entries are dropped on load."""
+    now = time.time()
+    cache: dict[str, list] = {}
+    # the whole parse sits in the try: a wrong-shaped but valid JSON file
+    # (non-dict, bad entry arity, non-numeric timestamp) is corruption too
+    try:
+        raw = json.loads(MAGNET_CACHE_PATH.read_text())
+        for avid, (link, ts) in raw.items():
+            ttl = MAGNET_CACHE_TTL_SECONDS if link else MAGNET_CACHE_NEGATIVE_TTL_SECONDS
+            if now - ts < ttl:
+                cache[avid] = [link, ts]
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+    return cache
+
+
+def _save_magnet_cache(cache: dict[str, list]) -> None:
+    try:
+        MAGNET_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        MAGNET_CACHE_PATH.write_text(json.dumps(cache, indent=2))
+    except OSError:
+        log.exception('Failed to save magnet cache')
+
+
+def _wait_for_finished_tasks(max_wait: float = 10.0) -> None:
+    """
+    Poll the clouddrive queue with exponential backoff instead of a fixed 10s
+    sleep; returns as soon as a finished task shows up or max_wait elapses.
+    """
+    deadline = time.monotonic() + max_wait
+    delay = 0.2
+    while True:
+        try:
+            if list_finished_targets():
+                return
+        except Exception:
+            log.exception('Failed to poll finished offline files')
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, 3.2)
+
+
+def _collect_batch_results(avid_batch: list[str], results: list[dict], avid_item: dict[str, list[dict]], read_item_ids: list[str]) -> bool:
+    """Gather read ids for landed magnets; returns True when any add failed."""
+    any_failed = False
+    for avid, result in zip(avid_batch, results, strict=True):
+        # mark as read
+        if result['type'] in ['success', 'duplicate']:
+            read_item_ids.extend([item['id'] for item in avid_item[avid]])
+        # log for warning
+        if result['type'] == 'duplicate':
+            log.warning('Duplicate magnet for %s', avid)
+        if result['type'] == 'failed':
+            log.warning('Failed to add magnet to 115: %s', avid)
+            any_failed = True
+    return any_failed
+
+
+def _mark_items_read(item_ids: list[str]) -> None:
+    # one FreshRSS round-trip for the whole run instead of one per batch of 20
+    for i in range(0, len(item_ids), FRESHRSS_READ_CHUNK):
+        chunk = item_ids[i : i + FRESHRSS_READ_CHUNK]
         try:
-            res = clouddrive.add_offline_file(link, config.clouddrive.task_dir_path)
-            if res.success:
-                log.info('Added magnet to 115: %s', link)
-                results.append({'type': 'success', 'link': link})
-            else:
-                log.error('Failed to add magnet to 115: %s: %s', link, res)
-                results.append({'type': 'failed', 'link': link, 'response': res})
-        except RpcError as e:
-            if '任务已存在' in e.details():
-                log.warning('Duplicate magnet for %s', link)
-                results.append({'type': 'duplicate', 'link': link})
-            else:
-                log.exception('Failed to add magnet to 115: %s: %s', link, e.details())
-                results.append({'type': 'failed', 'link': link, 'response': e.details()})
-    return results
+            freshrss.read_items(chunk)
+        except Exception:
+            log.exception('Failed to mark %d items as read', len(chunk))
 
 
 def add_magnets_and_read(avid_magnet: dict[str, str], avid_item: dict[str, list[dict]]) -> None:
     magnets = list(avid_magnet.values())
     avids = list(avid_magnet.keys())
+    # AIMD pacing between batches: double the delay when 115 rejects a batch,
+    # decay it additively while batches go through clean
+    delay = 0.0
+    read_item_ids: list[str] = []
     for i in range(0, len(magnets), 20):
         magnets_batch = magnets[i : i + 20]
         avid_batch = avids[i : i + 20]
+        if delay:
+            log.info('Waiting %.0f seconds before next magnet batch', delay)
+            time.sleep(delay)
         try:
             results = add_magnets(magnets_batch)
         except Exception:
             log.exception('Failed to add magnets to 115')
+            delay = min(ADD_BATCH_DELAY_MAX, max(1.0, delay * 2))
             continue
-        mark_as_read_item_id = []
-        for avid, result in zip(avid_batch, results, strict=True):
-            # mark as read
-            if result['type'] in ['success', 'duplicate']:
-                mark_as_read_item_id.extend([item['id'] for item in avid_item[avid]])
-            # log for warning
-            if result['type'] == 'duplicate':
-                log.warning('Duplicate magnet for %s', avid)
-            if result['type'] == 'failed':
-                log.warning('Failed to add magnet to 115: %s', avid)
-        if mark_as_read_item_id:
-            try:
-                freshrss.read_items(mark_as_read_item_id)
-            except Exception:
-                log.exception('Failed to mark %d items as read', len(mark_as_read_item_id))
+        if _collect_batch_results(avid_batch, results, avid_item, read_item_ids):
+            delay = min(ADD_BATCH_DELAY_MAX, max(1.0, delay * 2))
+        else:
+            delay = max(0.0, delay - 1.0)
+    _mark_items_read(read_item_ids)
     if len(magnets) > 0:
-        log.info('Wait 10 seconds for magnets ')
-        time.sleep(10)
+        log.info('Waiting for 115 to process new magnets')
+        _wait_for_finished_tasks()
 
 
 async def get_magnet(avid: str, items: list[dict], avid_magnet: dict[str, str]) -> None:
@@ -142,6 +232,9 @@ async def get_magnet(avid: str, items: list[dict], avid_magnet: dict[str, str])
             return
     except Exception:
         log.exception('Failed to get magnet from javbus for %s', avid)
+        # transient scrape failure: back off for an hour instead of the full
+        # day, by backdating the failure timestamp main() checks against
+        FAILED_AVID_COOLDOWN[avid] = time.time() - COOLDOWN_SECONDS + TRANSIENT_COOLDOWN_SECONDS
     # leave one item unread when failed to get magnet
     if len(items) == 1:
         log.warning('Failed to get magnet for %s', items[0]['title'])
@@ -187,58 +280,91 @@ def refresh_finished_magnets() -> None:
         clear_finished_magnets()
 
 
-async def main(*, rank: bool = False) -> None:  # noqa: C901
-    label = 'Rank' if rank else 'Actor'
-    items = freshrss.get_items(label)
-    log.info('Find %d items in %s', len(items), label)
-    if not items:
-        refresh_finished_magnets()
-        return
-    avid_item = {}
+def _group_items_by_avid(items: list[dict]) -> dict[str, list[dict]]:
+    avid_item: dict[str, list[dict]] = {}
     for item in items:
         avid = get_avid(item['title'])
         if not avid:
             log.warning('Failed to get avid for %s', item['title'])
             continue
-        if avid not in avid_item:
-            avid_item[avid] = []
-        avid_item[avid].append(item)
-    log.info('Find %d unique avids in %s', len(avid_item), label)
+        avid_item.setdefault(avid, []).append(item)
+    return avid_item
+
+
+def _filter_cooldown(avid_item: dict[str, list[dict]]) -> dict[str, list[dict]]:
     cooldown = FAILED_AVID_COOLDOWN
     now = time.time()
     expired_avids = [avid for avid, ts in cooldown.items() if now - ts >= COOLDOWN_SECONDS]
     for avid in expired_avids:
         cooldown.pop(avid, None)
-    active_avid_item = {}
-    skipped_avids = []
-    for avid, avid_items in avid_item.items():
-        if avid in cooldown:
-            skipped_avids.append(avid)
-            continue
-        active_avid_item[avid] = avid_items
-    if skipped_avids:
-        log.info('Skipping %d avids due to cooldown', len(skipped_avids))
+    active_avid_item = {avid: avid_items for avid, avid_items in avid_item.items() if avid not in cooldown}
+    skipped = len(avid_item) - len(active_avid_item)
+    if skipped:
+        log.info('Skipping %d avids due to cooldown', skipped)
+    return active_avid_item
+
+
+def _consult_magnet_cache(active_avid_item: dict[str, list[dict]]) -> tuple[dict[str, list], dict[str, str], dict[str, list[dict]]]:
+    magnet_cache = _load_magnet_cache()
+    avid_magnet: dict[str, str] = {}
+    to_fetch: dict[str, list[dict]] = {}
+    for avid, avid_items in active_avid_item.items():
+        hit = magnet_cache.get(avid)
+        if hit is None:
+            to_fetch[avid] = avid_items
+        elif hit[0]:
+            avid_magnet[avid] = hit[0]
+        # fresh negative entry: skip the lookup this run
+    if len(to_fetch) < len(active_avid_item):
+        log.info('Magnet cache answered %d of %d avids', len(active_avid_item) - len(to_fetch), len(active_avid_item))
+    return magnet_cache, avid_magnet, to_fetch
+
+
+def _record_failed_avids(failed_avid: list[str]) -> None:
+    if not failed_avid:
+        return
+    log_lines = [f'Failed to get magnets for {len(failed_avid)} items:']
+    log_lines.extend(f'{i}' for i in failed_avid)
+    log.warning(' '.join(log_lines))
+    failure_time = time.time()
+    for avid in failed_avid:
+        # setdefault keeps the shorter backdated entry from a transient
+        # javbus failure
+        FAILED_AVID_COOLDOWN.setdefault(avid, failure_time)
+
+
+async def main(*, rank: bool = False) -> None:
+    label = 'Rank' if rank else 'Actor'
+    items = freshrss.get_items(label)
+    log.info('Find %d items in %s', len(items), label)
+    if not items:
+        refresh_finished_magnets()
+        return
+    avid_item = _group_items_by_avid(items)
+    log.info('Find %d unique avids in %s', len(avid_item), label)
+    active_avid_item = _filter_cooldown(avid_item)
     if not active_avid_item:
         refresh_finished_magnets()
         return
-    # get magnets
-    avid_magnet = {}
-    tasks = [get_magnet_safely(k, v, avid_magnet) for k, v in active_avid_item.items()]
+    # get magnets, consulting the disk cache first
+    magnet_cache, avid_magnet, to_fetch = _consult_magnet_cache(active_avid_item)
+    semaphore = asyncio.Semaphore(GET_MAGNET_CONCURRENCY)
+
+    async def get_magnet_bounded(avid: str, avid_items: list[dict]) -> None:
+        async with semaphore:
+            await get_magnet_safely(avid, avid_items, avid_magnet)
+
+    tasks = [get_magnet_bounded(k, v) for k, v in to_fetch.items()]
     await tqdm_asyncio.gather(*tasks)
+    fetch_time = time.time()
+    for avid in to_fetch:
+        magnet_cache[avid] = [avid_magnet.get(avid), fetch_time]
+    _save_magnet_cache(magnet_cache)
     magnet_lines = list(avid_magnet.values())
     log_lines = [f'Found {len(magnet_lines)} magnets']
     log_lines.extend(magnet_lines)
     log.info('\n'.join(log_lines))
-    # store to txt
-    failed_avid = [i for i in active_avid_item if i not in avid_magnet]
-    if failed_avid:
-        log_lines = [f'Failed to get magnets for {len(failed_avid)} items:']
-        for i in failed_avid:
-            log_lines.append(f'{i}')
-        log.warning(' '.join(log_lines))
-        failure_time = time.time()
-        for avid in failed_avid:
-            cooldown[avid] = failure_time
+    _record_failed_avids([i for i in to_fetch if i not in avid_magnet])
     # add magnets to 115
     add_magnets_and_read(avid_magnet, active_avid_item)
     refresh_finished_magnets()
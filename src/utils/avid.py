@@ -1,5 +1,6 @@
 """获取和转换影片的各类番号(DVD ID, DMM cid, DMM pid)"""
 
+import functools
 import re
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -9,6 +10,32 @@ if TYPE_CHECKING:
 
 MIN_BRAND_LENGTH = 2
 
+# get_id runs once per RSS item; compiling its patterns at import keeps each
+# call to pure matching (the ignore pattern is config-derived, see _ignore_re)
+_FC2_RE = re.compile(r'FC2[^A-Z\d]{0,5}(PPV[^A-Z\d]{0,5})?(\d{5,7})', re.IGNORECASE)
+_HEYDOUGA_RE = re.compile(r'(HEYDOUGA)[-_]*(\d{4})[-_]0?(\d{3,5})', re.IGNORECASE)
+_GETCHU_RE = re.compile(r'GETCHU[-_]*(\d+)', re.IGNORECASE)
+_GYUTTO_RE = re.compile(r'GYUTTO-(\d+)', re.IGNORECASE)
+_LUXU_RE = re.compile(r'259LUXU-(\d+)', re.IGNORECASE)
+_DOMAIN_RE = re.compile(r'\w{3,10}\.(COM|NET|APP|XYZ)', re.IGNORECASE)
+_HEY_RE = re.compile(r'(?:HEY)[-_]*(\d{4})[-_]0?(\d{3,5})', re.IGNORECASE)
+_MUGEN_RE = re.compile(r'(MKB?D)[-_]*(S\d{2,3})|(MK3D2DBD|S2M|S2MBD)[-_]*(\d{2,3})', re.IGNORECASE)
+_IBW_RE = re.compile(r'(IBW)[-_](\d{2,5}z)', re.IGNORECASE)
+_DASH_ID_RE = re.compile(r'([A-Z]{2,10})[-_](\d{2,5})', re.IGNORECASE)
+_TOHO_SERIES_RE = re.compile(r'(RED[01]\d\d|SKY[0-3]\d\d|EX00[01]\d)', re.IGNORECASE)
+_NODASH_ID_RE = re.compile(r'([A-Z]{2,})(\d{2,5})', re.IGNORECASE)
+_TMA_RE = re.compile(r'(T[23]8[-_]\d{3})')
+_TOHO_NK_RE = re.compile(r'(N\d{4}|K\d{4})', re.IGNORECASE)
+_NUM_ID_RE = re.compile(r'(\d{6}[-_]\d{2,3})')
+_CD_RE = re.compile(r'CD(\d+).')
+
+
+@functools.lru_cache(maxsize=4)
+def _ignore_re(patterns: tuple[str, ...]) -> re.Pattern[str]:
+    # config is stable for the life of the process, but keying on the patterns
+    # keeps this correct if tests swap cfg out
+    return re.compile('|'.join(patterns))
+
 
 def _get_config() -> 'Avid':
     """Load ID parsing configuration only for operations that require it."""
@@ -17,7 +44,9 @@ def _get_config() -> 'Avid':
     return config.avid
 
 
+@functools.lru_cache(maxsize=8192)
 def get_avid(title: str) -> str:
+    # safe to key on the title alone: config is constructed once per process
     cfg = _get_config()
     title = title.replace('/', '')
     for s in cfg.get_id_exceptions:
@@ -26,6 +55,7 @@ def get_avid(title: str) -> str:
     return get_id(title).upper()
 
 
+@functools.lru_cache(maxsize=4096)
 def get_brand(avid: str) -> str | None:
     if '-' not in avid:
         return None
@@ -36,7 +66,7 @@ def get_brand(avid: str) -> str | None:
 
 
 def get_cd(title: str) -> str | None:
-    if result := re.search(r'CD(\d+).', title):
+    if result := _CD_RE.search(title):
         return result.group(1)
     return None
 
@@ -46,73 +76,72 @@ def get_id(filepath_str: str) -> str:  # noqa: C901, PLR0911, PLR0912
     cfg = _get_config()
     filepath = Path(filepath_str)
     # 通常是接收文件的路径, 当然如果是普通字符串也可以
-    ignore_pattern = re.compile('|'.join(cfg.ignored_id_pattern))
-    norm = ignore_pattern.sub('', filepath.stem).upper()
+    norm = _ignore_re(tuple(cfg.ignored_id_pattern)).sub('', filepath.stem).upper()
     if 'FC2' in norm:
         # 根据FC2 Club的影片数据, FC2编号为5-7个数字
-        match = re.search(r'FC2[^A-Z\d]{0,5}(PPV[^A-Z\d]{0,5})?(\d{5,7})', norm, re.IGNORECASE)
+        match = _FC2_RE.search(norm)
         if match:
             return 'FC2-' + match.group(2)
     elif 'HEYDOUGA' in norm:
-        match = re.search(r'(HEYDOUGA)[-_]*(\d{4})[-_]0?(\d{3,5})', norm, re.IGNORECASE)
+        match = _HEYDOUGA_RE.search(norm)
         if match:
             return '-'.join(match.groups())
     elif 'GETCHU' in norm:
-        match = re.search(r'GETCHU[-_]*(\d+)', norm, re.IGNORECASE)
+        match = _GETCHU_RE.search(norm)
         if match:
             return 'GETCHU-' + match.group(1)
     elif 'GYUTTO' in norm:
-        match = re.search(r'GYUTTO-(\d+)', norm, re.IGNORECASE)
+        match = _GYUTTO_RE.search(norm)
         if match:
             return 'GYUTTO-' + match.group(1)
     elif '259LUXU' in norm:  # special case having form of '259luxu'
-        match = re.search(r'259LUXU-(\d+)', norm, re.IGNORECASE)
+        match = _LUXU_RE.search(norm)
         if match:
             return '259LUXU-' + match.group(1)
 
     else:
         # 先尝试移除可疑域名进行匹配, 如果匹配不到再使用原始文件名进行匹配
-        no_domain = re.sub(r'\w{3,10}\.(COM|NET|APP|XYZ)', '', norm, flags=re.IGNORECASE)
+        no_domain = _DOMAIN_RE.sub('', norm)
         if no_domain != norm:
             avid = get_avid(no_domain)
             if avid:
                 return avid
         # 匹配缩写成hey的heydouga影片。由于番号分三部分, 要先于后面分两部分的进行匹配
-        match = re.search(r'(?:HEY)[-_]*(\d{4})[-_]0?(\d{3,5})', norm, re.IGNORECASE)
+        match = _HEY_RE.search(norm)
         if match:
             return 'heydouga-' + '-'.join(match.groups())
         # 匹配片商 MUGEN 的奇怪番号。由于MK3D2DBD的模式, 要放在普通番号模式之前进行匹配
-        match = re.search(r'(MKB?D)[-_]*(S\d{2,3})|(MK3D2DBD|S2M|S2MBD)[-_]*(\d{2,3})', norm, re.IGNORECASE)
+        match = _MUGEN_RE.search(norm)
         if match:
             return match.group(1) + '-' + match.group(2) if match.group(1) is not None else match.group(3) + '-' + match.group(4)
         # 匹配IBW这样带有后缀z的番号
-        match = re.search(r'(IBW)[-_](\d{2,5}z)', norm, re.IGNORECASE)
+        match = _IBW_RE.search(norm)
         if match:
             return match.group(1) + '-' + match.group(2)
         # 普通番号, 优先尝试匹配带分隔符的, 如ABC-123
-        match = re.search(r'([A-Z]{2,10})[-_](\d{2,5})', norm, re.IGNORECASE)
+        match = _DASH_ID_RE.search(norm)
         if match:
             return match.group(1) + '-' + match.group(2)
         # 普通番号, 运行到这里时表明无法匹配到带分隔符的番号
         # 先尝试匹配东热的red, sky, ex三个不带-分隔符的系列
         # 这三个系列已停止更新, 因此根据其作品编号将数字范围限制得小一些以降低误匹配概率
-        match = re.search(r'(RED[01]\d\d|SKY[0-3]\d\d|EX00[01]\d)', norm, re.IGNORECASE)
+        match = _TOHO_SERIES_RE.search(norm)
         if match:
             return match.group(1)
         # 然后再将影片视作缺失了-分隔符来匹配
-        match = re.search(r'([A-Z]{2,})(\d{2,5})', norm, re.IGNORECASE)
+        match = _NODASH_ID_RE.search(norm)
         if match:
             return match.group(1) + '-' + match.group(2)
     # 尝试匹配TMA制作的影片(如'T28-557', 他家的番号很乱)
-    match = re.search(r'(T[23]8[-_]\d{3})', norm)
+    match = _TMA_RE.search(norm)
     if match:
         return match.group(1)
     # 尝试匹配东热n, k系列
-    match = re.search(r'(N\d{4}|K\d{4})', norm, re.IGNORECASE)
+    match = _TOHO_NK_RE.search(norm)
     if match:
         return match.group(1)
     # 尝试匹配纯数字番号, 无码影片
-    match = re.search(r'(\d{6}[-_]\d{2,3})', norm)
+    match = _NUM_ID_RE.search(norm)
     if match:
         return match.group(1)
     # 如果还是匹配不了, 尝试将')('替换为'-'后再试, 少部分影片的番号是由')('分隔的
@@ -1,4 +1,5 @@
 import errno
+import itertools
 from typing import Any
 
 import grpc
@@ -7,6 +8,15 @@ from google.protobuf import empty_pb2
 from . import clouddrive_pb2, clouddrive_pb2_grpc
 
 GRPC_TIMEOUT_SECONDS = 30.0
+# keep the HTTP/2 connection warm so RPCs after an idle period don't pay a
+# fresh TLS handshake, and allow large directory-listing responses
+GRPC_CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.max_receive_message_length', 32 * 1024 * 1024),
+]
 
 
 class CloudDriveClient:
@@ -28,18 +38,19 @@ class CloudDriveClient:
             legacy_config = _get_legacy_config()
             address = legacy_config.address if address is None else address
             api_token = legacy_config.api_token if api_token is None else api_token
-        self._api_token = api_token
-        self.channel = grpc.secure_channel(address, grpc.ssl_channel_credentials()) if secure else grpc.insecure_channel(address)
+        # grpc accepts any iterable of 2-tuples; one immutable tuple is built
+        # here instead of a fresh list per RPC
+        self._metadata = (('authorization', f'Bearer {api_token}'),)
+        if secure:
+            self.channel = grpc.secure_channel(address, grpc.ssl_channel_credentials(), options=GRPC_CHANNEL_OPTIONS)
+        else:
+            self.channel = grpc.insecure_channel(address, options=GRPC_CHANNEL_OPTIONS)
         self.stub = clouddrive_pb2_grpc.CloudDriveFileSrvStub(self.channel)
 
     def close(self) -> None:
         """关闭通道"""
         self.channel.close()
 
-    def _create_authorized_metadata(self) -> list[tuple[str, str]]:
-        """创建带授权头的元数据"""
-        return [('authorization', f'Bearer {self._api_token}')]
-
     def get_system_info(self) -> clouddrive_pb2.CloudDriveSystemInfo:
         """获取系统信息(无需认证)
 
@@ -63,12 +74,11 @@ class CloudDriveClient:
             forceRefresh=force_refresh,
         )
 
-        metadata = self._create_authorized_metadata()
-        files = []
-
+        # SubFilesReply carries no total count to preallocate from, so gather
+        # the per-response chunks and build the list in one pass at the end
         try:
-            for response in self.stub.GetSubFiles(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS):
-                files.extend(response.subFiles)
+            stream = self.stub.GetSubFiles(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
+            chunks = [response.subFiles for response in stream]
         except grpc.RpcError as e:
             if getattr(e, 'code', None) and e.code() == grpc.StatusCode.NOT_FOUND:
                 details = getattr(e, 'details', lambda: None)()
@@ -80,7 +90,7 @@ class CloudDriveClient:
                     raise NotADirectoryError(errno.ENOTDIR, details, path) from e
             raise
 
-        return files
+        return list(itertools.chain.from_iterable(chunks))
 
     def create_folder(self, parent_path: str, folder_name: str) -> clouddrive_pb2.CreateFolderResult:
         """创建新文件夹
@@ -97,8 +107,7 @@ class CloudDriveClient:
             folderName=folder_name,
         )
 
-        metadata = self._create_authorized_metadata()
-        return self.stub.CreateFolder(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        return self.stub.CreateFolder(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
     def delete_file(self, file_path: str) -> clouddrive_pb2.FileOperationResult:
         """删除文件或文件夹
@@ -110,8 +119,7 @@ class CloudDriveClient:
             FileOperationResult: 操作结果
         """
         request = clouddrive_pb2.FileRequest(path=file_path)
-        metadata = self._create_authorized_metadata()
-        return self.stub.DeleteFile(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        return self.stub.DeleteFile(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
     def rename_file(self, file_path: str, new_name: str) -> clouddrive_pb2.FileOperationResult:
         """重命名文件
@@ -128,8 +136,7 @@ class CloudDriveClient:
             newName=new_name,
         )
 
-        metadata = self._create_authorized_metadata()
-        return self.stub.RenameFile(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        return self.stub.RenameFile(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
     def move_file(self, source_paths: list[str], dest_path: str, conflict_policy: int = 0) -> clouddrive_pb2.FileOperationResult:
         """移动文件到目标位置
@@ -148,8 +155,7 @@ class CloudDriveClient:
             conflictPolicy=conflict_policy,
         )
 
-        metadata = self._create_authorized_metadata()
-        return self.stub.MoveFile(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        return self.stub.MoveFile(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
     def add_offline_file(self, urls: str | list[str], dst_dir: str) -> clouddrive_pb2.FileOperationResult:
         """添加离线文件
@@ -165,8 +171,7 @@ class CloudDriveClient:
             toFolder=dst_dir,
             checkFolderAfterSecs=0,
         )
-        metadata = self._create_authorized_metadata()
-        return self.stub.AddOfflineFiles(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        return self.stub.AddOfflineFiles(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
     def list_finished_offline_files_by_path(self, path: str) -> clouddrive_pb2.OfflineFileListResult:
         """列出指定路径下的离线文件
@@ -176,14 +181,14 @@ class CloudDriveClient:
             OfflineFileListResult: 仅包含已完成(OFFLINE_FINISHED)的 OfflineFile 列表
         """
         request = clouddrive_pb2.FileRequest(path=path)
-        metadata = self._create_authorized_metadata()
-        result = self.stub.ListOfflineFilesByPath(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        result = self.stub.ListOfflineFilesByPath(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
-        finished = [f for f in result.offlineFiles if f.status == clouddrive_pb2.OfflineFileStatus.OFFLINE_FINISHED]
-        return clouddrive_pb2.OfflineFileListResult(
-            offlineFiles=finished,
-            status=result.status,
-        )
+        # prune unfinished entries in place instead of copying every finished
+        # sub-message into a rebuilt OfflineFileListResult
+        for i in reversed(range(len(result.offlineFiles))):
+            if result.offlineFiles[i].status != clouddrive_pb2.OfflineFileStatus.OFFLINE_FINISHED:
+                del result.offlineFiles[i]
+        return result
 
     def clear_finished_offline_files(self, path: str) -> None:
         """清除已完成下载的离线文件
@@ -198,8 +203,7 @@ class CloudDriveClient:
             deleteFiles=False,
             path=path,
         )
-        metadata = self._create_authorized_metadata()
-        self.stub.ClearOfflineFiles(request, metadata=metadata, timeout=GRPC_TIMEOUT_SECONDS)
+        self.stub.ClearOfflineFiles(request, metadata=self._metadata, timeout=GRPC_TIMEOUT_SECONDS)
 
 
 def _get_legacy_config() -> Any:
@@ -1,4 +1,9 @@
+import asyncio
+import json
+import time
+from collections.abc import Awaitable, Callable
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 
 import httpx
 from pydantic import BaseModel
@@ -29,6 +34,29 @@ class Item(BaseModel):
 cfg = config.emby
 _client: httpx.AsyncClient | None = None
 avid_id = {}
+AVID_ID_CACHE_PATH = Path('data/avid_id.json')
+_avid_scanned = False
+_avid_lock = asyncio.Lock()
+_name_id_cache: dict[str, tuple[float, dict[str, str]]] = {}
+NAME_ID_TTL_SECONDS = 60.0
+EMBY_CONCURRENCY = 8
+_emby_sem: asyncio.Semaphore | None = None
+_sem_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _get_sem() -> asyncio.Semaphore:
+    # created lazily so the semaphore binds to the running loop
+    global _sem_loop, _emby_sem
+    loop = asyncio.get_running_loop()
+    if _emby_sem is None or _sem_loop is not loop:
+        _emby_sem = asyncio.Semaphore(EMBY_CONCURRENCY)
+        _sem_loop = loop
+    return _emby_sem
+
+
+async def _bounded[T](func: Callable[..., Awaitable[T]], *args: object) -> T:
+    async with _get_sem():
+        return await func(*args)
 
 
 def _get_client() -> httpx.AsyncClient:
@@ -39,12 +67,14 @@ def _get_client() -> httpx.AsyncClient:
 
 
 async def aclose_client() -> None:
-    global _client
+    global _client, _avid_scanned
     if _client is None:
         return
     await _client.aclose()
     _client = None
     avid_id.clear()
+    _name_id_cache.clear()
+    _avid_scanned = False
 
 
 async def get_item_playbackinfo(item_id: str) -> dict:
@@ -86,6 +116,17 @@ async def get_items(item_type: str | None = None, ids: list[str] | None = None)
     return res.json()['Items']
 
 
+async def _get_name_id(item_type: str) -> dict[str, str]:
+    # playlist/boxset lookups hit the same full recursive query per operation;
+    # a short TTL turns a bulk sync into one fetch per item type
+    cached = _name_id_cache.get(item_type)
+    if cached is not None and time.monotonic() - cached[0] < NAME_ID_TTL_SECONDS:
+        return cached[1]
+    name_id = {i['Name']: i['Id'] for i in await get_items(item_type)}
+    _name_id_cache[item_type] = (time.monotonic(), name_id)
+    return name_id
+
+
 async def get_image(item_id: str, route: str) -> bytes:
     url = f'{cfg.url}/Items/{item_id}/Images/{route}'
     res = await _get_client().get(url)
@@ -94,7 +135,7 @@ async def get_image(item_id: str, route: str) -> bytes:
 
 
 async def list_playlist(playlist: str) -> list[dict]:
-    name_id = {i['Name']: i['Id'] for i in await get_items('Playlist')}
+    name_id = await _get_name_id('Playlist')
     if playlist not in name_id:
         msg = f'Playlist not found: {playlist}'
         raise ValueError(msg)
@@ -105,7 +146,7 @@ async def list_playlist(playlist: str) -> list[dict]:
 
 
 async def playlist_add(playlist: str, item_id_list: list[str]) -> None:
-    name_id = {i['Name']: i['Id'] for i in await get_items('Playlist')}
+    name_id = await _get_name_id('Playlist')
     url = f'{cfg.url}/Playlists/{name_id[playlist]}/Items'
     data = {
         'Ids': ','.join(item_id_list),
@@ -115,7 +156,7 @@ async def playlist_add(playlist: str, item_id_list: list[str]) -> None:
 
 
 async def playlist_remove(playlist: str, playlist_item_id_list: list[str]) -> None:
-    name_id = {i['Name']: i['Id'] for i in await get_items('Playlist')}
+    name_id = await _get_name_id('Playlist')
     if playlist not in name_id:
         msg = f'Playlist not found: {playlist}'
         raise ValueError(msg)
@@ -127,16 +168,18 @@ async def playlist_remove(playlist: str, playlist_item_id_list: list[str]) -> No
     res.raise_for_status()
 
 
-async def playlist_dedup(playlist: str) -> None:
+async def _find_playlist_dups(playlist: str) -> tuple[dict[str, dict], list[str]]:
     items = await list_playlist(playlist)
-    ids_map = {i['Id']: i for i in items}
-    ids = []
-    dup_ids = []
+    # setdefault keeps the first occurrence; any later item mapping to a
+    # different object is a repeat
+    ids_map: dict[str, dict] = {}
     for item in items:
-        if item['Id'] in ids:
-            dup_ids.append(item['Id'])
-        else:
-            ids.append(item['Id'])
+        ids_map.setdefault(item['Id'], item)
+    dup_ids = [item['Id'] for item in items if ids_map[item['Id']] is not item]
+    return ids_map, dup_ids
+
+
+async def _prompt_playlist_dedup(playlist: str, ids_map: dict[str, dict], dup_ids: list[str]) -> None:
     if not dup_ids:
         return
     for idv in dup_ids:
@@ -146,14 +189,24 @@ async def playlist_dedup(playlist: str) -> None:
     await playlist_remove(playlist, [ids_map[i]['PlaylistItemId'] for i in dup_ids])
 
 
+async def playlist_dedup(playlist: str) -> None:
+    ids_map, dup_ids = await _find_playlist_dups(playlist)
+    await _prompt_playlist_dedup(playlist, ids_map, dup_ids)
+
+
 async def all_playlist_dedup() -> None:
-    items = await get_items('Playlist')
-    for item in items:
-        await playlist_dedup(item['Name'])
+    names = [item['Name'] for item in await get_items('Playlist')]
+    # warm the name-to-id cache before fanning out, otherwise the first batch
+    # of list_playlist calls races up to 8 identical full Playlist queries
+    await _get_name_id('Playlist')
+    # fetch every playlist concurrently; the confirmation prompts stay serial
+    results = await asyncio.gather(*[_bounded(_find_playlist_dups, name) for name in names])
+    for name, (ids_map, dup_ids) in zip(names, results, strict=True):
+        await _prompt_playlist_dedup(name, ids_map, dup_ids)
 
 
 async def collection_list(collection: str) -> list[dict]:
-    name_id = {i['Name']: i['Id'] for i in await get_items('BoxSet')}
+    name_id = await _get_name_id('BoxSet')
     if collection not in name_id:
         msg = f'Collection not found: {collection}'
         raise ValueError(msg)
@@ -169,7 +222,7 @@ async def collection_list(collection: str) -> list[dict]:
 
 
 async def collection_add(collection: str, item_id_list: list[str]) -> None:
-    name_id = {i['Name']: i['Id'] for i in await get_items('BoxSet')}
+    name_id = await _get_name_id('BoxSet')
     url = f'{cfg.url}/Collections/{name_id[collection]}/Items'
     data = {
         'Ids': ','.join(item_id_list),
@@ -178,18 +231,49 @@ async def collection_add(collection: str, item_id_list: list[str]) -> None:
     res.raise_for_status()
 
 
+def _load_avid_cache() -> dict[str, str]:
+    if not AVID_ID_CACHE_PATH.exists():
+        return {}
+    try:
+        return json.loads(AVID_ID_CACHE_PATH.read_text())
+    except (OSError, json.JSONDecodeError):
+        log.warning('Failed to load avid cache from %s, rescanning', AVID_ID_CACHE_PATH)
+        return {}
+
+
+def _save_avid_cache() -> None:
+    try:
+        AVID_ID_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        AVID_ID_CACHE_PATH.write_text(json.dumps(avid_id))
+    except OSError:
+        log.warning('Failed to save avid cache to %s', AVID_ID_CACHE_PATH)
+
+
+async def _scan_avid_id() -> None:
+    items = await get_items('Movie')
+    avid_id.clear()
+    for i in items:
+        _avid = get_id(i['Name'])
+        if not _avid:
+            msg = f'Failed to get avid in {i["Name"]}'
+            raise ValueError(msg)
+        if _avid in avid_id:
+            msg = f'Duplicate avid: {i["Name"]}'
+            raise ValueError(msg)
+        avid_id[_avid] = i['Id']
+    _save_avid_cache()
+
+
 async def get_id_by_avid(avid: str) -> str | None:
-    if not avid_id:
-        items = await get_items('Movie')
-        for i in items:
-            _avid = get_id(i['Name'])
-            if not _avid:
-                msg = f'Failed to get avid in {i["Name"]}'
-                raise ValueError(msg)
-            if _avid in avid_id:
-                msg = f'Duplicate avid: {i["Name"]}'
-                raise ValueError(msg)
-            avid_id[_avid] = i['Id']
+    global _avid_scanned
+    async with _avid_lock:
+        if not avid_id and not _avid_scanned:
+            # serve cold starts from the disk cache and only pay the full
+            # Movie scan when an avid is genuinely unknown
+            avid_id.update(_load_avid_cache())
+        if avid not in avid_id and not _avid_scanned:
+            await _scan_avid_id()
+            _avid_scanned = True
     if avid not in avid_id:
         return None
     return avid_id[avid]
@@ -206,8 +290,9 @@ async def refresh(item_id: str) -> None:
 
 async def refresh_library() -> None:
     libs = await get_items('CollectionFolder')
-    for lib in libs:
-        await refresh(lib['Id'])
+    # refreshes are independent Emby requests; overlap them instead of paying
+    # each round trip back to back
+    await asyncio.gather(*[_bounded(refresh, lib['Id']) for lib in libs])
 
 
 async def get_the_latest_update() -> datetime:
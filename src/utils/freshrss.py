@@ -1,3 +1,5 @@
+from collections.abc import Iterator
+
 import httpx
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
@@ -59,21 +61,32 @@ def _get_edit_token() -> str:
     retry=retry_if_exception_type(FRESHRSS_RETRY_EXCEPTIONS),
     reraise=True,
 )
-def get_items(label: str) -> list[dict]:
-    """Get RSS items from a specific label."""
+def _fetch_page(url: str, params: dict) -> dict:
+    res = _get_client().get(url, headers=_get_headers(), params=params, timeout=10)
+    res.raise_for_status()
+    return res.json()
+
+
+def iter_items(label: str) -> Iterator[dict]:
+    """Stream RSS items from a specific label, page by page.
+
+    Retrying happens per page, so a failure deep into pagination doesn't
+    refetch everything from the start.
+    """
     params = {'xt': 'user/-/state/com.google/read'}
-    items = []
+    url = f'{config.freshrss.freshrss_url}/stream/contents/user/-/label/{label}'
     while True:
-        url = f'{config.freshrss.freshrss_url}/stream/contents/user/-/label/{label}'
-        res = _get_client().get(url, headers=_get_headers(), params=params, timeout=10)
-        res.raise_for_status()
-        content = res.json()
-        items += content['items']
+        content = _fetch_page(url, params)
+        yield from content['items']
         if content.get('continuation'):
             params['c'] = content['continuation']
         else:
             break
-    return items
+
+
+def get_items(label: str) -> list[dict]:
+    """Get RSS items from a specific label."""
+    return list(iter_items(label))
 
 
 @retry(
@@ -8,7 +8,7 @@ import humanfriendly
 import nyaapy.parser
 import nyaapy.torrent
 from pyquery import PyQuery
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 
 from src.utils.avid import get_avid
 
@@ -114,7 +114,7 @@ class sukebei:  # noqa: N801
     @classmethod
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
+        wait=wait_random_exponential(multiplier=1, max=60),
         retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
         reraise=True,
     )
@@ -9,7 +9,7 @@ from urllib.parse import urlparse
 import httpx
 import humanfriendly
 from pyquery import PyQuery
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_random_exponential
 from tqdm.asyncio import tqdm_asyncio
 
 log = logging.getLogger('embyx-monitor.javbus')
@@ -35,7 +35,9 @@ class javbus:  # noqa: N801
                     'Cookie': 'existmag=all',
                 },
                 timeout=60,
-                limits=httpx.Limits(max_keepalive_connections=0, max_connections=10),
+                # keep connections alive between requests: a scrape or magnet
+                # lookup otherwise pays a fresh TLS handshake per page
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=10),
                 proxy=None,
             )
         return cls._client
@@ -162,7 +164,7 @@ class javbus:  # noqa: N801
     @classmethod
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
+        wait=wait_random_exponential(multiplier=1, max=60),
         retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
         reraise=True,
     )
@@ -213,7 +215,7 @@ class javbus:  # noqa: N801
     @classmethod
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
+        wait=wait_random_exponential(multiplier=1, max=60),
         retry=retry_if_exception_type((httpx.HTTPError, httpx.TimeoutException)),
         reraise=True,
     )
@@ -1028,21 +1028,22 @@ def test_main_orchestrates_calls(
 
     dummy_clouddrive.get_sub_files.assert_called_once_with("/task_dir_path", force_refresh=True)
 
+    # each phase receives the listing returned by the previous one
     assert clear_mock.call_args_list == [
         call(mod.cfg.src_dir / "inbox"),
         call(mod.cfg.src_dir / "in2"),
     ]
     assert flatten_mock.call_args_list == [
-        call(mod.cfg.src_dir / "inbox", mod.cfg.dst_dir / "outbox"),
-        call(mod.cfg.src_dir / "in2", mod.cfg.dst_dir / "out2"),
+        call(mod.cfg.src_dir / "inbox", mod.cfg.dst_dir / "outbox", clear_mock.return_value),
+        call(mod.cfg.src_dir / "in2", mod.cfg.dst_dir / "out2", clear_mock.return_value),
     ]
     assert rename_mock.call_args_list == [
-        call(mod.cfg.src_dir / "inbox"),
-        call(mod.cfg.src_dir / "in2"),
+        call(mod.cfg.src_dir / "inbox", flatten_mock.return_value),
+        call(mod.cfg.src_dir / "in2", flatten_mock.return_value),
     ]
     assert archive_mock.call_args_list == [
-        call(mod.cfg.src_dir / "inbox", mod.cfg.dst_dir / "outbox"),
-        call(mod.cfg.src_dir / "in2", mod.cfg.dst_dir / "out2"),
+        call(mod.cfg.src_dir / "inbox", mod.cfg.dst_dir / "outbox", rename_mock.return_value),
+        call(mod.cfg.src_dir / "in2", mod.cfg.dst_dir / "out2", rename_mock.return_value),
     ]
 
 
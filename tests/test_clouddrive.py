@@ -77,6 +77,6 @@ def test_clouddrive_supports_explicit_connection_injection(
         assert secure_channel.call_args.args[0] == 'clouddrive.internal:80'
         insecure_channel.assert_not_called()
     else:
-        insecure_channel.assert_called_once_with('clouddrive.internal:80')
+        insecure_channel.assert_called_once_with('clouddrive.internal:80', options=clouddrive_module.GRPC_CHANNEL_OPTIONS)
         secure_channel.assert_not_called()
-    assert get_sub_files.call_args.kwargs['metadata'] == [('authorization', 'Bearer test-token')]
+    assert get_sub_files.call_args.kwargs['metadata'] == (('authorization', 'Bearer test-token'),)
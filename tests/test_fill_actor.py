@@ -0,0 +1,32 @@
+import re
+
+import pytest
+
+from src.fill_actor import _matches_avid
+
+AVID = 'ABC-123'
+# the regex _matches_avid replaced; kept as the reference implementation
+AVID_RE = re.compile(AVID + r'(?:-cd\d{1,2})?\..+')
+
+
+@pytest.mark.parametrize(
+    ('name', 'expected'),
+    [
+        ('ABC-123.mp4', True),
+        ('ABC-123.strm', True),
+        ('ABC-123-cd1.mp4', True),
+        ('ABC-123-cd12.mkv', True),
+        ('abc-123.mp4', False),  # avid match is case-sensitive
+        ('ABC-123-CD1.mp4', False),  # -cd suffix is lowercase on disk
+        ('ABC-123-cd123.mp4', False),
+        ('ABC-123-cdx.mp4', False),
+        ('ABC-123-cd1', False),
+        ('ABC-123.', False),
+        ('ABC-123', False),
+        ('ABC-1234.mp4', False),
+        ('ABC-12.mp4', False),
+    ],
+)
+def test_matches_avid(name: str, expected: bool) -> None:  # noqa: FBT001
+    assert _matches_avid(name, AVID) is expected
+    assert bool(AVID_RE.match(name)) is expected
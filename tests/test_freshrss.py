@@ -44,7 +44,8 @@ def test_get_items_raises_for_http_errors(monkeypatch: pytest.MonkeyPatch) -> No
     bad_response = SimpleNamespace(raise_for_status=Mock(side_effect=_status_error(500)))
     client = SimpleNamespace(get=Mock(return_value=bad_response))
     monkeypatch.setattr(freshrss, '_client', client)
-    monkeypatch.setattr(freshrss.get_items.retry, 'sleep', lambda _seconds: None)
+    # retrying moved to the per-page fetch
+    monkeypatch.setattr(freshrss._fetch_page.retry, 'sleep', lambda _seconds: None)  # noqa: SLF001
 
     with pytest.raises(httpx.HTTPStatusError):
         freshrss.get_items('Actor')
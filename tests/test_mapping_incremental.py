@@ -165,6 +165,70 @@ def test_delete_one_removes_file_and_empty_dirs(tmp_path: Path, monkeypatch: pyt
     assert mapping.counter.files_deleted == 1
 
 
+def test_update_many_collects_failures_and_updates_the_rest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mapping = import_mapping(monkeypatch, tmp_path)
+    src_dir = tmp_path / 'src'
+    dst_dir = tmp_path / 'dst'
+    good_src = src_dir / 'a' / 'ABC-123.strm'
+    bad_src = src_dir / 'a' / 'DEF-456.strm'
+    good_src.parent.mkdir(parents=True)
+    good_src.write_text('data', encoding='utf-8')
+    bad_src.write_text('data', encoding='utf-8')
+    # a directory at the destination makes update_one raise FileExistsError
+    (dst_dir / 'a' / 'DEF-456' / 'DEF-456.strm').mkdir(parents=True)
+    monkeypatch.setattr(mapping, 'get_avid', lambda name: name.split('.')[0])
+    mapping.reset_counter()
+
+    failed = mapping.update_many([good_src, bad_src], src_dir, dst_dir)
+
+    assert failed == {bad_src}
+    assert (dst_dir / 'a' / 'ABC-123' / 'ABC-123.strm').read_text(encoding='utf-8') == 'data'
+    assert mapping.counter.files_updated == 1
+
+
+def test_delete_many_collects_failures_and_deletes_the_rest(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mapping = import_mapping(monkeypatch, tmp_path)
+    src_dir = tmp_path / 'src'
+    dst_dir = tmp_path / 'dst'
+    good_src = src_dir / 'a' / 'ABC-123.strm'
+    bad_src = src_dir / 'a' / 'DEF-456.strm'
+    good_dst = dst_dir / 'a' / 'ABC-123' / 'ABC-123.strm'
+    good_dst.parent.mkdir(parents=True)
+    good_dst.write_text('data', encoding='utf-8')
+    # unlink on a directory raises, exercising the failure collection
+    (dst_dir / 'a' / 'DEF-456' / 'DEF-456.strm').mkdir(parents=True)
+    monkeypatch.setattr(mapping, 'get_avid', lambda name: name.split('.')[0])
+    mapping.reset_counter()
+
+    failed = mapping.delete_many([good_src, bad_src], src_dir, dst_dir)
+
+    assert failed == {bad_src}
+    assert not good_dst.exists()
+    assert mapping.counter.files_deleted == 1
+
+
+def test_delete_stale_removes_unexpected_files_and_prunes_dirs(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    mapping = import_mapping(monkeypatch, tmp_path)
+    dst_dir = tmp_path / 'dst'
+    live_path = dst_dir / 'a' / 'ABC-123' / 'ABC-123.strm'
+    stale_path = dst_dir / 'a' / 'DEF-456' / 'DEF-456.strm'
+    live_path.parent.mkdir(parents=True)
+    live_path.write_text('data', encoding='utf-8')
+    stale_path.parent.mkdir(parents=True)
+    stale_path.write_text('data', encoding='utf-8')
+    mapping.reset_counter()
+
+    mapping.delete_stale(dst_dir, {str(live_path)})
+
+    assert live_path.exists()
+    assert not stale_path.exists()
+    assert not stale_path.parent.exists()
+    # the shared parent keeps a live .strm below it and must survive
+    assert (dst_dir / 'a').is_dir()
+    assert mapping.counter.files_deleted == 1
+    assert mapping.counter.dirs_deleted == 1
+
+
 def test_main_creates_missing_destination_directory(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     mapping = import_mapping(monkeypatch, tmp_path)
     src_dir = tmp_path / 'src'
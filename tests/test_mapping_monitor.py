@@ -71,73 +71,72 @@ def import_monitor(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> ModuleTyp
 
 def build_handler(
     monitor_module: ModuleType,
-) -> tuple[object, Event, dict[str, float], dict[str, int], set, set]:
+) -> tuple[object, Event, object, set, set]:
     trigger_event = Event()
-    last_event_time = {'value': 0.0}
-    event_counter = {'value': 0}
+    state = monitor_module.EventState()
     changed_paths = set()
     deleted_paths = set()
     lock = Lock()
-    handler = monitor_module.StrmChangeHandler(trigger_event, last_event_time, event_counter, changed_paths, deleted_paths, lock)
-    return handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths
+    handler = monitor_module.StrmChangeHandler(trigger_event, state, changed_paths, deleted_paths, lock)
+    return handler, trigger_event, state, changed_paths, deleted_paths
 
 
 def test_strm_change_handler_marks_strm_event(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monitor_module = import_monitor(monkeypatch, tmp_path)
-    handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths = build_handler(monitor_module)
+    handler, trigger_event, state, changed_paths, deleted_paths = build_handler(monitor_module)
     with patch('src.monitor.time.monotonic', return_value=123.0):
         handler.on_created(FileCreatedEvent('/tmp/video.strm'))
     assert trigger_event.is_set()
-    assert last_event_time['value'] == 123.0
-    assert event_counter['value'] == 1
+    assert state.last_event_time == 123.0
+    assert state.event_count == 1
     assert Path('/tmp/video.strm') in changed_paths
     assert not deleted_paths
 
 
 def test_strm_change_handler_ignores_non_strm(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monitor_module = import_monitor(monkeypatch, tmp_path)
-    handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths = build_handler(monitor_module)
+    handler, trigger_event, state, changed_paths, deleted_paths = build_handler(monitor_module)
     with patch('src.monitor.time.monotonic', return_value=456.0):
         handler.on_created(FileCreatedEvent('/tmp/video.txt'))
     assert not trigger_event.is_set()
-    assert last_event_time['value'] == 0.0
-    assert event_counter['value'] == 0
+    assert state.last_event_time == 0.0
+    assert state.event_count == 0
     assert not changed_paths
     assert not deleted_paths
 
 
 def test_strm_change_handler_ignores_directories(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monitor_module = import_monitor(monkeypatch, tmp_path)
-    handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths = build_handler(monitor_module)
+    handler, trigger_event, state, changed_paths, deleted_paths = build_handler(monitor_module)
     with patch('src.monitor.time.monotonic', return_value=789.0):
         handler.on_created(DirCreatedEvent('/tmp/videos'))
     assert not trigger_event.is_set()
-    assert last_event_time['value'] == 0.0
-    assert event_counter['value'] == 0
+    assert state.last_event_time == 0.0
+    assert state.event_count == 0
     assert not changed_paths
     assert not deleted_paths
 
 
 def test_strm_change_handler_tracks_move_destination(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monitor_module = import_monitor(monkeypatch, tmp_path)
-    handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths = build_handler(monitor_module)
+    handler, trigger_event, state, changed_paths, deleted_paths = build_handler(monitor_module)
     with patch('src.monitor.time.monotonic', return_value=321.0):
         handler.on_moved(FileMovedEvent('/tmp/old.txt', '/tmp/new.strm'))
     assert trigger_event.is_set()
-    assert last_event_time['value'] == 321.0
-    assert event_counter['value'] == 1
+    assert state.last_event_time == 321.0
+    assert state.event_count == 1
     assert Path('/tmp/new.strm') in changed_paths
     assert Path('/tmp/old.txt') not in deleted_paths
 
 
 def test_strm_change_handler_tracks_delete(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     monitor_module = import_monitor(monkeypatch, tmp_path)
-    handler, trigger_event, last_event_time, event_counter, changed_paths, deleted_paths = build_handler(monitor_module)
+    handler, trigger_event, state, changed_paths, deleted_paths = build_handler(monitor_module)
     with patch('src.monitor.time.monotonic', return_value=654.0):
         handler.on_deleted(FileDeletedEvent('/tmp/old.strm'))
     assert trigger_event.is_set()
-    assert last_event_time['value'] == 654.0
-    assert event_counter['value'] == 1
+    assert state.last_event_time == 654.0
+    assert state.event_count == 1
     assert Path('/tmp/old.strm') in deleted_paths
     assert Path('/tmp/old.strm') not in changed_paths
 
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 import asyncio
 import importlib
+import json
 import sys
+import tempfile
+from pathlib import Path
 from types import ModuleType, SimpleNamespace
 from typing import TYPE_CHECKING
 from unittest.mock import Mock
@@ -57,6 +60,8 @@ def import_rss(monkeypatch: pytest.MonkeyPatch) -> ModuleType:
     monkeypatch.delitem(sys.modules, 'src.rss', raising=False)
     rss_module = importlib.import_module('src.rss')
     monkeypatch.setitem(sys.modules, 'src.rss', rss_module)
+    # keep the magnet disk cache out of the repo tree
+    monkeypatch.setattr(rss_module, 'MAGNET_CACHE_PATH', Path(tempfile.mkdtemp()) / 'magnet_cache.json')
     return rss_module
 
 
@@ -173,7 +178,65 @@ def test_add_magnets_and_read_batches_twenty(monkeypatch: pytest.MonkeyPatch) ->
     rss_module.add_magnets_and_read(avid_magnet, avid_item)
 
     assert batch_sizes == [20, 1]
-    assert rss_module.freshrss.read_items.call_count == 2
+    # read ids accumulate across batches into a single call
+    assert rss_module.freshrss.read_items.call_count == 1
+    assert len(rss_module.freshrss.read_items.call_args.args[0]) == 21
+
+
+def test_magnet_cache_load_applies_ttls(monkeypatch: pytest.MonkeyPatch) -> None:
+    rss_module = import_rss(monkeypatch)
+    now = rss_module.time.time()
+    path = rss_module.MAGNET_CACHE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'FRESH-001': ['magnet:?xt=urn:btih:abc', now - 60],
+        'STALE-001': ['magnet:?xt=urn:btih:def', now - rss_module.MAGNET_CACHE_TTL_SECONDS - 1],
+        'MISS-001': [None, now - 60],
+        'OLDMISS-001': [None, now - rss_module.MAGNET_CACHE_NEGATIVE_TTL_SECONDS - 1],
+    }))
+
+    cache = rss_module._load_magnet_cache()  # noqa: SLF001
+
+    assert set(cache) == {'FRESH-001', 'MISS-001'}
+
+
+def test_magnet_cache_load_tolerates_corruption(monkeypatch: pytest.MonkeyPatch) -> None:
+    rss_module = import_rss(monkeypatch)
+    path = rss_module.MAGNET_CACHE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # wrong-shaped but valid JSON must degrade to a cold cache, not crash main
+    for content in ['not json', '["a", "b"]', '{"ABC-001": "magnet"}', '{"ABC-001": [1]}', '{"ABC-001": ["m", "ts"]}']:
+        path.write_text(content)
+        assert rss_module._load_magnet_cache() == {}  # noqa: SLF001
+
+
+def test_main_serves_magnets_from_disk_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    rss_module = import_rss(monkeypatch)
+    monkeypatch.setattr(rss_module, 'get_avid', lambda title: title)
+    rss_module.freshrss.get_items.return_value = [
+        {'id': '1', 'title': 'HIT-001'},
+        {'id': '2', 'title': 'MISS-001'},
+    ]
+    now = rss_module.time.time()
+    path = rss_module.MAGNET_CACHE_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({
+        'HIT-001': ['magnet:?xt=urn:btih:abc', now - 60],
+        'MISS-001': [None, now - 60],
+    }))
+    add_mock = Mock()
+    get_magnet_mock = Mock()
+    monkeypatch.setattr(rss_module, 'add_magnets_and_read', add_mock)
+    monkeypatch.setattr(rss_module, 'get_magnet', get_magnet_mock)
+    monkeypatch.setattr(rss_module, 'refresh_finished_magnets', Mock())
+    rss_module.FAILED_AVID_COOLDOWN.clear()
+
+    asyncio.run(rss_module.main())
+
+    get_magnet_mock.assert_not_called()
+    assert add_mock.call_args.args[0] == {'HIT-001': 'magnet:?xt=urn:btih:abc'}
+    # a fresh negative entry skips the lookup without entering the cooldown
+    assert 'MISS-001' not in rss_module.FAILED_AVID_COOLDOWN
 
 
 def test_main_skips_avid_in_cooldown(monkeypatch: pytest.MonkeyPatch) -> None: